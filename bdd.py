@@ -0,0 +1,321 @@
+import time
+from budget import get_budget
+from formula import node_to_formula, get_unique_subformulas
+from results import SatResult, ValidityResult, EquivalenceResult
+
+
+class BDD:
+    __slots__ = ("names", "index", "order", "level", "var", "low", "high", "refs", "unique", "cache", "free", "live",
+                 "budget", "gc_threshold", "reorder_threshold", "reordering")
+
+    def __init__(self, variables=(), budget=None, gc_threshold=1 << 16, reorder_threshold=1 << 12, reordering=True):
+        self.names = []
+        self.index = {}
+        self.order = []
+        self.level = []
+        self.var = [-1, -1]
+        self.low = [0, 1]
+        self.high = [0, 1]
+        self.refs = [0, 0]
+        self.unique = []
+        self.cache = {}
+        self.free = []
+        self.live = 0
+        self.budget = get_budget(budget)
+        self.gc_threshold = gc_threshold
+        self.reorder_threshold = reorder_threshold
+        self.reordering = reordering
+        for name in variables:
+            self.add_variable(name)
+
+
+    def add_variable(self, name):
+        if name not in self.index:
+            self.index[name] = len(self.names)
+            self.names.append(name)
+            self.level.append(len(self.order))
+            self.order.append(self.index[name])
+            self.unique.append({})
+        return self.index[name]
+
+
+    def get_level(self, u):
+        return self.level[self.var[u]] if u > 1 else len(self.order)
+
+
+    def ref(self, u):
+        if u > 1:
+            self.refs[u] += 1
+        return u
+
+
+    def deref(self, u):
+        if u > 1:
+            self.refs[u] -= 1
+
+
+    def make(self, var, low, high):
+        if low == high:
+            return low
+        table = self.unique[var]
+        u = table.get((low, high))
+        if u is None:
+            if self.free:
+                u = self.free.pop()
+                self.var[u] = var
+                self.low[u] = low
+                self.high[u] = high
+                self.refs[u] = 0
+            else:
+                u = len(self.var)
+                self.var.append(var)
+                self.low.append(low)
+                self.high.append(high)
+                self.refs.append(0)
+            table[(low, high)] = u
+            self.ref(low)
+            self.ref(high)
+            self.live += 1
+            if self.budget is not None:
+                self.budget.check_nodes(self.live, "the bdd construction")
+        return u
+
+
+    def variable(self, name):
+        return self.make(self.add_variable(name), 0, 1)
+
+
+    def cofactors(self, u, level):
+        if u > 1 and self.level[self.var[u]] == level:
+            return self.low[u], self.high[u]
+        return u, u
+
+
+    def ite(self, f, g, h):
+        if f == 1:
+            return g
+        if f == 0:
+            return h
+        if g == h:
+            return g
+        if g == 1 and h == 0:
+            return f
+        key = (f, g, h)
+        result = self.cache.get(key)
+        if result is None:
+            level = min(self.get_level(f), self.get_level(g), self.get_level(h))
+            f0, f1 = self.cofactors(f, level)
+            g0, g1 = self.cofactors(g, level)
+            h0, h1 = self.cofactors(h, level)
+            low = self.ite(f0, g0, h0)
+            high = self.ite(f1, g1, h1)
+            result = self.make(self.order[level], low, high)
+            self.cache[key] = result
+        return result
+
+
+    def negate(self, u):
+        return self.ite(u, 0, 1)
+
+
+    def apply(self, op, u, v):
+        if op == "∧":
+            return self.ite(u, v, 0)
+        if op == "∨":
+            return self.ite(u, 1, v)
+        if op == "⇒":
+            return self.ite(u, v, 1)
+        if op == "⇔":
+            return self.ite(u, v, self.negate(v))
+        raise Exception(f"Unknown connective {op}.")
+
+
+    def from_node(self, node):
+        formula = node_to_formula(node)
+        subformulas = get_unique_subformulas(formula)
+        for f in subformulas:
+            if f.is_leaf and f.name not in ["⊤", "⊥"]:
+                self.add_variable(f.name)
+        built = {}
+        for f in subformulas:
+            if f.is_leaf:
+                u = 1 if f.name == "⊤" else 0 if f.name == "⊥" else self.variable(f.name)
+            elif f.name == "¬":
+                u = self.negate(built[f.children[0]])
+            else:
+                u = self.ref(built[f.children[0]])
+                for child in f.children[1:]:
+                    result = self.ref(self.apply(f.name, u, built[child]))
+                    self.deref(u)
+                    u = result
+                self.deref(u)
+            built[f] = self.ref(u)
+            self.maybe_collect()
+        root = self.ref(built[formula])
+        for u in built.values():
+            self.deref(u)
+        return root
+
+
+    def release(self, dead):
+        while dead:
+            u = dead.pop()
+            if self.var[u] < 0 or self.refs[u] != 0:
+                continue
+            del self.unique[self.var[u]][(self.low[u], self.high[u])]
+            for child in (self.low[u], self.high[u]):
+                if child > 1:
+                    self.refs[child] -= 1
+                    if self.refs[child] == 0:
+                        dead.append(child)
+            self.var[u] = -1
+            self.free.append(u)
+            self.live -= 1
+
+
+    def collect_garbage(self):
+        self.cache = {}
+        self.release([u for u in range(2, len(self.var)) if self.var[u] >= 0 and self.refs[u] == 0])
+
+
+    def maybe_collect(self):
+        if self.live > self.gc_threshold:
+            self.collect_garbage()
+            if self.live > self.gc_threshold // 2:
+                self.gc_threshold *= 2
+        if self.reordering and self.live > self.reorder_threshold:
+            self.reorder()
+            self.reorder_threshold = max(self.reorder_threshold, 2 * self.live)
+
+
+    def swap(self, level):
+        x, y = self.order[level], self.order[level + 1]
+        nodes = list(self.unique[x].values())
+        self.order[level], self.order[level + 1] = y, x
+        self.level[x], self.level[y] = level + 1, level
+        dead = []
+        for u in nodes:
+            f0, f1 = self.low[u], self.high[u]
+            if self.var[f0] != y and self.var[f1] != y:
+                continue
+            f00, f01 = (self.low[f0], self.high[f0]) if self.var[f0] == y else (f0, f0)
+            f10, f11 = (self.low[f1], self.high[f1]) if self.var[f1] == y else (f1, f1)
+            del self.unique[x][(f0, f1)]
+            low = self.ref(self.make(x, f00, f10))
+            high = self.ref(self.make(x, f01, f11))
+            self.var[u] = y
+            self.low[u] = low
+            self.high[u] = high
+            self.unique[y][(low, high)] = u
+            for child in (f0, f1):
+                if child > 1:
+                    self.refs[child] -= 1
+                    if self.refs[child] == 0:
+                        dead.append(child)
+        self.release(dead)
+
+
+    def sift(self, var, max_growth):
+        best_size, best_level = self.live, self.level[var]
+        limit = best_size * max_growth
+        for step in [1, -1]:
+            while 0 <= self.level[var] + step < len(self.order):
+                self.swap(min(self.level[var], self.level[var] + step))
+                if self.live < best_size:
+                    best_size, best_level = self.live, self.level[var]
+                if self.live > limit:
+                    break
+        while self.level[var] != best_level:
+            self.swap(min(self.level[var], self.level[var] + (1 if self.level[var] < best_level else -1)))
+
+
+    def reorder(self, max_growth=1.2):
+        self.collect_garbage()
+        budget, self.budget = self.budget, None
+        try:
+            for var in sorted(range(len(self.names)), key=lambda v: -len(self.unique[v])):
+                self.sift(var, max_growth)
+        finally:
+            self.budget = budget
+        if self.budget is not None:
+            self.budget.check_time("the bdd reordering")
+
+
+    def size(self, u):
+        seen = set()
+        stack = [u]
+        while stack:
+            u = stack.pop()
+            if u > 1 and u not in seen:
+                seen.add(u)
+                stack.extend((self.low[u], self.high[u]))
+        return len(seen)
+
+
+    def count_models(self, u, variables=None):
+        counts = {0: 0, 1: 1}
+
+        def count(u):
+            if u not in counts:
+                level = self.get_level(u)
+                low, high = self.low[u], self.high[u]
+                counts[u] = (count(low) << (self.get_level(low) - level - 1)) + (count(high) << (self.get_level(high) - level - 1))
+            return counts[u]
+
+        total = count(u) << self.get_level(u)
+        if variables is not None:
+            total >>= len(self.order) - len(variables)
+        return total
+
+
+    def get_model(self, u, variables=()):
+        if u == 0:
+            return None
+        model = dict.fromkeys(variables, False)
+        while u > 1:
+            name = self.names[self.var[u]]
+            if self.low[u] != 0:
+                model[name] = False
+                u = self.low[u]
+            else:
+                model[name] = True
+                u = self.high[u]
+        return model
+
+
+def get_formula_variables(*nodes):
+    return sorted(set().union(*(node_to_formula(node).variables for node in nodes)))
+
+
+def check_equivalence_bdd(left, right, budget=None):
+    started = time.perf_counter()
+    manager = BDD(budget=budget)
+    u = manager.from_node(left)
+    v = manager.from_node(right)
+    if u == v:
+        return EquivalenceResult(True, None, time.perf_counter() - started)
+    difference = manager.ite(u, manager.negate(v), v)
+    return EquivalenceResult(False, manager.get_model(difference, get_formula_variables(left, right)), time.perf_counter() - started)
+
+
+def check_validity_bdd(node, budget=None):
+    started = time.perf_counter()
+    manager = BDD(budget=budget)
+    u = manager.from_node(node)
+    counterexample = None if u == 1 else manager.get_model(manager.negate(u), get_formula_variables(node))
+    return ValidityResult(u == 1, counterexample, "bdd", {"nodes": manager.size(u)}, time.perf_counter() - started)
+
+
+def check_satisfiability_bdd(node, budget=None):
+    started = time.perf_counter()
+    variables = get_formula_variables(node)
+    manager = BDD(budget=budget)
+    u = manager.from_node(node)
+    stats = {"nodes": manager.size(u), "models": manager.count_models(u, variables)}
+    return SatResult(u != 0, manager.get_model(u, variables), "bdd", stats, time.perf_counter() - started)
+
+
+def count_models(node, budget=None):
+    manager = BDD(budget=budget)
+    u = manager.from_node(node)
+    return manager.count_models(u, get_formula_variables(node))
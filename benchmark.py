@@ -0,0 +1,304 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+PARSE_SCRIPT = """
+import contextlib, inspect, io, json, sys, time
+sys.path.insert(0, sys.argv[1])
+sys.setrecursionlimit(100000)
+from wff import relaxed_to_strong
+from utility import get_node_expression
+
+options = {"need_print": False}
+if "use_cache" in inspect.signature(relaxed_to_strong).parameters:
+    options["use_cache"] = sys.argv[3] == "cached"
+
+formulas = json.load(sys.stdin)
+best = None
+results = []
+with contextlib.redirect_stdout(io.StringIO()):
+    for _ in range(int(sys.argv[2])):
+        start = time.perf_counter()
+        for formula in formulas:
+            try:
+                relaxed_to_strong(formula, **options)
+            except Exception:
+                pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    for formula in formulas:
+        try:
+            results.append(get_node_expression(relaxed_to_strong(formula, **options)))
+        except Exception as e:
+            results.append("error: " + str(e).splitlines()[0])
+print(json.dumps({"seconds": best, "results": results}))
+"""
+
+
+def random_relaxed_formula(rng, depth, variables):
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(variables + ["⊤", "⊥"])
+    connective = rng.choice("¬∧∨⇒⇔")
+    if connective == "¬":
+        return "¬" + random_relaxed_formula(rng, depth - 1, variables)
+    formula = random_relaxed_formula(rng, depth - 1, variables) + connective + random_relaxed_formula(rng, depth - 1, variables)
+    return f"({formula})" if rng.random() < 0.6 else formula
+
+
+def generate_formulas(count, depth, seed, num_variables=6):
+    rng = random.Random(seed)
+    variables = [f"P{i}" for i in range(1, num_variables + 1)]
+    return [random_relaxed_formula(rng, depth, variables) for _ in range(count)]
+
+
+def time_parser(path, formulas, repeat, cached=False):
+    process = subprocess.run([sys.executable, "-c", PARSE_SCRIPT, os.path.abspath(path), str(repeat), "cached" if cached else "uncached"],
+                             input=json.dumps(formulas), capture_output=True, text=True, encoding="utf-8")
+    if process.returncode != 0:
+        raise Exception(f"The parser benchmark failed for {path}:\n{process.stderr}")
+    return json.loads(process.stdout)
+
+
+def benchmark_parser(formulas, repeat, baseline=None, cached=False):
+    current = time_parser(os.path.dirname(os.path.abspath(__file__)), formulas, repeat, cached)
+    print(f"Current converter: {current['seconds']:.3f}s for {len(formulas)} formulas "
+          f"({len(formulas) / current['seconds']:.0f} formulas/s).")
+    if baseline is None:
+        return current
+
+    previous = time_parser(baseline, formulas, repeat)
+    print(f"Baseline converter: {previous['seconds']:.3f}s for {len(formulas)} formulas "
+          f"({len(formulas) / previous['seconds']:.0f} formulas/s).")
+    print(f"Speedup: {previous['seconds'] / current['seconds']:.2f}x")
+    differences = [(formula, old, new) for formula, old, new in zip(formulas, previous["results"], current["results"]) if old != new]
+    print(f"The converters agree on {len(formulas) - len(differences)} of {len(formulas)} formulas.")
+    for formula, old, new in differences[:5]:
+        print(f"\t{formula}: baseline {old}, current {new}")
+    return current
+
+
+def random_kcnf(rng, num_variables, k=3, ratio=4.26):
+    clauses = []
+    for _ in range(round(num_variables * ratio)):
+        literals = [("¬" if rng.random() < 0.5 else "") + f"P{variable}" for variable in rng.sample(range(1, num_variables + 1), k)]
+        clauses.append("(" + "∨".join(literals) + ")")
+    return "∧".join(clauses)
+
+
+def pigeonhole(holes):
+    def variable(pigeon, hole):
+        return f"P{pigeon * holes + hole + 1}"
+
+    clauses = ["(" + "∨".join(variable(pigeon, hole) for hole in range(holes)) + ")" for pigeon in range(holes + 1)]
+    for hole in range(holes):
+        for first in range(holes + 1):
+            for second in range(first + 1, holes + 1):
+                clauses.append(f"(¬{variable(first, hole)}∨¬{variable(second, hole)})")
+    return "∧".join(clauses)
+
+
+def parity_chain(length):
+    formula = "P1"
+    for index in range(2, length + 1):
+        formula = f"({formula}⇔P{index})"
+    return formula
+
+
+def nested_implications(depth):
+    formula = f"P{depth}"
+    for index in range(depth - 1, 0, -1):
+        formula = f"(P{index}⇒{formula})" if index % 2 else f"({formula}⇒¬P{index})"
+    return formula
+
+
+def wide_dnf(terms, width=2):
+    return "∨".join("(" + "∧".join(f"P{term * width + index + 1}" for index in range(width)) + ")" for term in range(terms))
+
+
+FAMILIES = {
+    "random_3cnf": lambda rng, size: random_kcnf(rng, size),
+    "pigeonhole": lambda rng, size: pigeonhole(size),
+    "parity_chain": lambda rng, size: parity_chain(size),
+    "nested_implications": lambda rng, size: nested_implications(size),
+    "wide_dnf": lambda rng, size: wide_dnf(size),
+}
+
+SIZES = {
+    "random_3cnf": [8, 16, 32],
+    "pigeonhole": [2, 3, 4],
+    "parity_chain": [4, 6, 8],
+    "nested_implications": [8, 32, 128],
+    "wide_dnf": [4, 8, 12],
+}
+
+
+def load_fol_parser():
+    with contextlib.redirect_stdout(io.StringIO()):
+        import predicate_logic
+    return predicate_logic
+
+
+def get_size(value):
+    if hasattr(value, "descendants"):
+        return len(value.descendants) + 1
+    if type(value) in [list, tuple]:
+        return len(value)
+    return bool(value)
+
+
+def get_operations(max_seconds, max_clauses, max_table_variables):
+    from budget import Budget, ResourceExhausted
+    from normal_form import transform_to_normal_form
+    from resolution import dpll, resolution
+    from tracing import SILENT
+    from utility import duplicate_node, generate_truth_table, get_variables
+    from wff import relaxed_to_strong
+
+    def normal_form(kind):
+        return lambda case: transform_to_normal_form(duplicate_node(case["node"]), kind, SILENT, Budget(max_clauses, max_seconds=max_seconds))
+
+    def truth_table(case):
+        if len(get_variables(case["node"])) > max_table_variables:
+            return None
+        return generate_truth_table(case["node"])
+
+    def clauses(case):
+        return [set(clause) for clause in case["clauses"][0]], case["clauses"][1]
+
+    return ResourceExhausted, {
+        "parse": lambda case: relaxed_to_strong(case["text"], need_print=False, use_cache=False),
+        "nnf": normal_form("nnf"),
+        "cnf": normal_form("cnf"),
+        "dnf": normal_form("dnf"),
+        "truth_table": truth_table,
+        "dpll": lambda case: dpll(*clauses(case), trace=SILENT, budget=Budget(max_seconds=max_seconds)),
+        "cdcl": lambda case: dpll(*clauses(case), backend="cdcl", trace=SILENT, budget=Budget(max_seconds=max_seconds)),
+        "resolution": lambda case: resolution(*clauses(case), trace=SILENT, budget=Budget(max_seconds=max_seconds)),
+    }
+
+
+def time_operation(operation, case, repeat, exhausted_type):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            value = operation(case)
+        except exhausted_type as e:
+            return {"seconds": time.perf_counter() - start, "status": "exhausted", "output": e.resource}
+        except Exception as e:
+            return {"seconds": time.perf_counter() - start, "status": "error", "output": str(e).splitlines()[0]}
+        elapsed = time.perf_counter() - start
+        if value is None:
+            return {"seconds": None, "status": "skipped", "output": None}
+        best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": best, "status": "ok", "output": get_size(value)}
+
+
+def run_suite(seed=0, repeat=3, families=None, max_seconds=5.0, max_clauses=100000, max_table_variables=14, fol=True):
+    from resolution import node_to_int_clauses
+    from tracing import SILENT
+    from wff import relaxed_to_strong
+    exhausted_type, operations = get_operations(max_seconds, max_clauses, max_table_variables)
+    rng = random.Random(seed)
+    results = []
+    for family in families or FAMILIES:
+        for size in SIZES[family]:
+            text = FAMILIES[family](rng, size)
+            node = relaxed_to_strong(text, need_print=False, use_cache=False)
+            case = {"text": text, "node": node, "clauses": node_to_int_clauses(node, tseitin=True, trace=SILENT)}
+            for name, operation in operations.items():
+                entry = {"family": family, "size": size, "operation": name, **time_operation(operation, case, repeat, exhausted_type)}
+                results.append(entry)
+                seconds = "-" if entry["seconds"] is None else f"{entry['seconds']:.4f}s"
+                print(f"{family:<20}{size:>6}  {name:<12}{seconds:>12}  {entry['status']}", file=sys.stderr)
+
+    if fol:
+        predicate_logic = load_fol_parser()
+
+        def parse_all(case):
+            parsed = 0
+            with contextlib.redirect_stdout(io.StringIO()):
+                for proposition in predicate_logic.propositions:
+                    try:
+                        predicate_logic.FirstOrderPredicateLogicParser(proposition, predicate_logic.language, False).parse()
+                        parsed += 1
+                    except Exception:
+                        pass
+            return [None] * parsed
+
+        entry = {"family": "fol_samples", "size": len(predicate_logic.propositions), "operation": "fol_parse",
+                 **time_operation(parse_all, {}, repeat, exhausted_type)}
+        results.append(entry)
+        print(f"{'fol_samples':<20}{entry['size']:>6}  {'fol_parse':<12}{entry['seconds']:>11.4f}s  {entry['status']}", file=sys.stderr)
+
+    return {"meta": {"python": platform.python_version(), "platform": platform.platform(), "seed": seed, "repeat": repeat,
+                     "max_seconds": max_seconds, "max_clauses": max_clauses, "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results}
+
+
+def compare_suites(previous, current, threshold=0.1):
+    old = {(entry["family"], entry["size"], entry["operation"]): entry for entry in previous["results"]}
+    regressions = 0
+    print(f"{'family':<20}{'size':>6}  {'operation':<12}{'before':>12}{'after':>12}{'ratio':>9}")
+    for entry in current["results"]:
+        before = old.get((entry["family"], entry["size"], entry["operation"]))
+        if before is None or before["seconds"] is None or entry["seconds"] is None:
+            continue
+        ratio = entry["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        notes = []
+        if before["status"] != entry["status"]:
+            notes.append(f"{before['status']} -> {entry['status']}")
+        elif before["output"] != entry["output"]:
+            notes.append(f"output {before['output']} -> {entry['output']}")
+        if ratio > 1 + threshold and entry["status"] == "ok":
+            regressions += 1
+            notes.append("slower")
+        print(f"{entry['family']:<20}{entry['size']:>6}  {entry['operation']:<12}{before['seconds']:>11.4f}s{entry['seconds']:>11.4f}s"
+              f"{ratio:>8.2f}x  {', '.join(notes)}")
+    print(f"{regressions} measurements are more than {threshold:.0%} slower.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the relaxed to strong syntax converter.")
+    parser.add_argument("--count", type=int, default=2000, help="number of random formulas")
+    parser.add_argument("--depth", type=int, default=6, help="maximum nesting depth of the random formulas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs; the fastest one is reported")
+    parser.add_argument("--baseline", help="path to another checkout of this project to compare against")
+    parser.add_argument("--cached", action="store_true", help="keep the parse cache enabled between the timed runs")
+    parser.add_argument("--suite", action="store_true", help="run the formula family suite instead of the parser comparison")
+    parser.add_argument("--families", nargs="+", choices=list(FAMILIES), help="families of the suite to run (default: all)")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="budget of a single normal form or solver run in the suite")
+    parser.add_argument("--max-clauses", type=int, default=100000, help="largest distribution a normal form may build in the suite")
+    parser.add_argument("--no-fol", action="store_true", help="skip the first order parser in the suite")
+    parser.add_argument("--json", help="write the suite results to this file")
+    parser.add_argument("--compare", help="previous suite results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if not args.suite:
+        formulas = generate_formulas(args.count, args.depth, args.seed)
+        benchmark_parser(formulas, args.repeat, args.baseline, args.cached)
+        return
+
+    results = run_suite(args.seed, args.repeat, args.families, args.max_seconds, args.max_clauses, fol=not args.no_fol)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            compare_suites(json.load(file), results, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import time
+
+
+class ResourceExhausted(Exception):
+    def __init__(self, resource, limit, used, stage):
+        self.resource = resource
+        self.limit = limit
+        self.used = used
+        self.stage = stage
+        super().__init__(f"Resource exhausted during {stage}: used {used} {resource}, the budget allows {limit}.")
+
+
+    def __reduce__(self):
+        return ResourceExhausted, (self.resource, self.limit, self.used, self.stage)
+
+
+    def to_dict(self):
+        return {"resource": self.resource, "limit": self.limit, "used": self.used, "stage": self.stage}
+
+
+class Budget:
+    __slots__ = ("max_clauses", "max_nodes", "max_seconds", "max_resolvents", "resolvents", "started")
+
+    def __init__(self, max_clauses=None, max_nodes=None, max_seconds=None, max_resolvents=None):
+        self.max_clauses = max_clauses
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.max_resolvents = max_resolvents
+        self.resolvents = 0
+        self.started = time.perf_counter()
+
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+    def check_time(self, stage):
+        if self.max_seconds is not None and time.perf_counter() - self.started > self.max_seconds:
+            raise ResourceExhausted("seconds", self.max_seconds, round(self.elapsed(), 3), stage)
+
+
+    def check_clauses(self, count, stage):
+        if self.max_clauses is not None and count > self.max_clauses:
+            raise ResourceExhausted("clauses", self.max_clauses, count, stage)
+        self.check_time(stage)
+
+
+    def check_nodes(self, count, stage):
+        if self.max_nodes is not None and count > self.max_nodes:
+            raise ResourceExhausted("nodes", self.max_nodes, count, stage)
+        self.check_time(stage)
+
+
+    def add_resolvent(self, stage):
+        self.resolvents += 1
+        if self.max_resolvents is not None and self.resolvents > self.max_resolvents:
+            raise ResourceExhausted("resolvents", self.max_resolvents, self.resolvents, stage)
+        self.check_time(stage)
+
+
+def get_budget(budget):
+    if budget is None or type(budget) == Budget:
+        return budget
+    return Budget(**budget)
@@ -0,0 +1,369 @@
+import heapq
+
+
+class Clause:
+    __slots__ = ("literals", "learned", "activity", "deleted")
+
+    def __init__(self, literals, learned=False):
+        self.literals = literals
+        self.learned = learned
+        self.activity = 0.0
+        self.deleted = False
+
+
+def luby(index):
+    size, sequence = 1, 0
+    while size < index + 1:
+        sequence += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        sequence -= 1
+        index %= size
+    return 1 << sequence
+
+
+class CDCLSolver:
+    def __init__(self, clauses=None, num_variables=0, restart_base=100, variable_decay=0.95, clause_decay=0.999):
+        self.num_variables = 0
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phase = [-1]
+        self.heap = []
+        self.watches = {}
+        self.clauses = []
+        self.learned = []
+        self.trail = []
+        self.trail_limits = []
+        self.queue_head = 0
+        self.variable_increment = 1.0
+        self.variable_decay = variable_decay
+        self.clause_increment = 1.0
+        self.clause_decay = clause_decay
+        self.restart_base = restart_base
+        self.max_learned = 0
+        self.adjust_conflicts = 100
+        self.next_adjust = 100
+        self.unsatisfiable = False
+        self.assumptions = []
+        self.failed_assumption = None
+        self.model = None
+        self.stats = {"decisions": 0, "propagations": 0, "conflicts": 0, "restarts": 0, "learned": 0, "deleted": 0}
+        self.ensure_variables(num_variables)
+        if clauses is not None:
+            self.add_clauses(clauses)
+
+
+    def ensure_variables(self, count):
+        while self.num_variables < count:
+            self.num_variables += 1
+            self.values.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phase.append(-1)
+            self.watches[self.num_variables] = []
+            self.watches[-self.num_variables] = []
+            heapq.heappush(self.heap, (0.0, self.num_variables))
+
+
+    def value(self, literal):
+        return self.values[literal] if literal > 0 else -self.values[-literal]
+
+
+    def decision_level(self):
+        return len(self.trail_limits)
+
+
+    def add_clauses(self, clauses):
+        for clause in clauses:
+            if not self.add_clause(clause):
+                return False
+        return True
+
+
+    def add_clause(self, literals):
+        if self.unsatisfiable:
+            return False
+        self.cancel_until(0)
+        literals = list(dict.fromkeys(literals))
+        self.ensure_variables(max((abs(literal) for literal in literals), default=0))
+        if any(-literal in literals for literal in literals):
+            return True
+        if any(self.value(literal) == 1 for literal in literals):
+            return True
+        literals = [literal for literal in literals if self.value(literal) == 0]
+        if not literals:
+            self.unsatisfiable = True
+            return False
+        if len(literals) == 1:
+            self.enqueue(literals[0], None)
+            if self.propagate() is not None:
+                self.unsatisfiable = True
+                return False
+            return True
+        clause = Clause(literals)
+        self.attach(clause)
+        self.clauses.append(clause)
+        return True
+
+
+    def attach(self, clause):
+        self.watches[clause.literals[0]].append(clause)
+        self.watches[clause.literals[1]].append(clause)
+
+
+    def enqueue(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = self.decision_level()
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+
+    def propagate(self):
+        values = self.values
+        while self.queue_head < len(self.trail):
+            false_literal = -self.trail[self.queue_head]
+            self.queue_head += 1
+            self.stats["propagations"] += 1
+            watchers = self.watches[false_literal]
+            kept = []
+            conflict = None
+            for index, clause in enumerate(watchers):
+                if clause.deleted:
+                    continue
+                if conflict is not None:
+                    kept.append(clause)
+                    continue
+                literals = clause.literals
+                if literals[0] == false_literal:
+                    literals[0], literals[1] = literals[1], literals[0]
+                first = literals[0]
+                first_value = values[first] if first > 0 else -values[-first]
+                if first_value == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(literals)):
+                    literal = literals[k]
+                    if (values[literal] if literal > 0 else -values[-literal]) != -1:
+                        literals[1], literals[k] = literal, false_literal
+                        self.watches[literal].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value == -1:
+                        conflict = clause
+                    else:
+                        self.enqueue(first, clause)
+            self.watches[false_literal] = kept
+            if conflict is not None:
+                self.queue_head = len(self.trail)
+                return conflict
+        return None
+
+
+    def analyze(self, conflict):
+        learned = [0]
+        seen = set()
+        counter = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            if clause.learned:
+                self.bump_clause(clause)
+            for q in clause.literals if literal is None else clause.literals[1:]:
+                variable = abs(q)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump_variable(variable)
+                    if self.levels[variable] >= self.decision_level():
+                        counter += 1
+                    else:
+                        learned.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+
+        marked = {abs(q) for q in learned}
+        levels = 0
+        for q in learned[1:]:
+            levels |= 1 << (self.levels[abs(q)] & 31)
+        learned = [learned[0]] + [q for q in learned[1:] if self.reasons[abs(q)] is None or not self.redundant(q, marked, levels)]
+
+        if len(learned) == 1:
+            return learned, 0
+        highest = max(range(1, len(learned)), key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+
+    def redundant(self, literal, marked, levels):
+        stack = [literal]
+        added = []
+        while stack:
+            for q in self.reasons[abs(stack.pop())].literals[1:]:
+                variable = abs(q)
+                if variable in marked or self.levels[variable] == 0:
+                    continue
+                if self.reasons[variable] is not None and levels & (1 << (self.levels[variable] & 31)):
+                    marked.add(variable)
+                    added.append(variable)
+                    stack.append(q)
+                else:
+                    marked.difference_update(added)
+                    return False
+        return True
+
+
+    def bump_variable(self, variable):
+        self.activity[variable] += self.variable_increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.variable_increment *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.num_variables + 1) if self.values[v] == 0]
+            heapq.heapify(self.heap)
+        if self.values[variable] == 0:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+
+    def bump_clause(self, clause):
+        clause.activity += self.clause_increment
+        if clause.activity > 1e20:
+            for learned in self.learned:
+                learned.activity *= 1e-20
+            self.clause_increment *= 1e-20
+
+
+    def cancel_until(self, level):
+        if self.decision_level() > level:
+            for index in range(len(self.trail) - 1, self.trail_limits[level] - 1, -1):
+                variable = abs(self.trail[index])
+                self.phase[variable] = self.values[variable]
+                self.values[variable] = 0
+                self.reasons[variable] = None
+                heapq.heappush(self.heap, (-self.activity[variable], variable))
+            del self.trail[self.trail_limits[level]:]
+            del self.trail_limits[level:]
+            self.queue_head = len(self.trail)
+
+
+    def pick_branch_literal(self):
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+            if self.values[variable] == 0 and -activity == self.activity[variable]:
+                return variable if self.phase[variable] == 1 else -variable
+        for variable in range(1, self.num_variables + 1):
+            if self.values[variable] == 0:
+                return variable if self.phase[variable] == 1 else -variable
+        return None
+
+
+    def locked(self, clause):
+        literal = clause.literals[0]
+        return self.reasons[abs(literal)] is clause and self.value(literal) == 1
+
+
+    def reduce_learned(self):
+        self.learned.sort(key=lambda clause: clause.activity)
+        limit = self.clause_increment / max(len(self.learned), 1)
+        kept = []
+        for index, clause in enumerate(self.learned):
+            if len(clause.literals) > 2 and not self.locked(clause) and (index < len(self.learned) // 2 or clause.activity < limit):
+                clause.deleted = True
+                self.stats["deleted"] += 1
+            else:
+                kept.append(clause)
+        self.learned = kept
+
+
+    def search(self, conflict_limit, budget=None):
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                conflicts += 1
+                if budget is not None:
+                    budget.check_time("cdcl")
+                self.stats["conflicts"] += 1
+                if self.decision_level() == 0:
+                    self.unsatisfiable = True
+                    return False
+                learned, level = self.analyze(conflict)
+                self.cancel_until(level)
+                self.stats["learned"] += 1
+                if len(learned) == 1:
+                    self.enqueue(learned[0], None)
+                else:
+                    clause = Clause(learned, learned=True)
+                    self.attach(clause)
+                    self.learned.append(clause)
+                    self.bump_clause(clause)
+                    self.enqueue(learned[0], clause)
+                self.variable_increment /= self.variable_decay
+                self.clause_increment /= self.clause_decay
+                if self.stats["conflicts"] >= self.next_adjust:
+                    self.adjust_conflicts *= 1.5
+                    self.next_adjust += self.adjust_conflicts
+                    self.max_learned *= 1.1
+            else:
+                if conflicts >= conflict_limit:
+                    self.cancel_until(0)
+                    return None
+                if len(self.learned) - len(self.trail) >= self.max_learned:
+                    self.reduce_learned()
+                literal = None
+                while self.decision_level() < len(self.assumptions):
+                    assumption = self.assumptions[self.decision_level()]
+                    if self.value(assumption) == 1:
+                        self.trail_limits.append(len(self.trail))
+                    elif self.value(assumption) == -1:
+                        self.failed_assumption = assumption
+                        return False
+                    else:
+                        literal = assumption
+                        break
+                if literal is None:
+                    literal = self.pick_branch_literal()
+                    if literal is None:
+                        return True
+                self.stats["decisions"] += 1
+                self.trail_limits.append(len(self.trail))
+                self.enqueue(literal, None)
+
+
+    def solve(self, assumptions=(), budget=None):
+        self.model = None
+        self.failed_assumption = None
+        if self.unsatisfiable:
+            return False
+        self.cancel_until(0)
+        self.assumptions = list(assumptions)
+        self.ensure_variables(max((abs(literal) for literal in self.assumptions), default=0))
+        self.max_learned = max(len(self.clauses) / 3, 100)
+        restarts = 0
+        while True:
+            try:
+                result = self.search(self.restart_base * luby(restarts), budget)
+            except Exception:
+                self.cancel_until(0)
+                self.assumptions = []
+                raise
+            if result is None:
+                restarts += 1
+                self.stats["restarts"] += 1
+                continue
+            if result:
+                self.model = {variable: self.values[variable] == 1 for variable in range(1, self.num_variables + 1)}
+            self.cancel_until(0)
+            self.assumptions = []
+            return result
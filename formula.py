@@ -0,0 +1,105 @@
+from weakref import WeakValueDictionary
+from utility import Node
+
+
+class Formula:
+    __slots__ = ("name", "children", "hash", "variables", "size", "__weakref__")
+    table = WeakValueDictionary()
+
+    def __new__(cls, name, children=()):
+        children = tuple(children)
+        key = (name, children)
+        formula = cls.table.get(key)
+        if formula is None:
+            formula = object.__new__(cls)
+            object.__setattr__(formula, "name", name)
+            object.__setattr__(formula, "children", children)
+            object.__setattr__(formula, "hash", hash(key))
+            if children:
+                variables = frozenset().union(*(child.variables for child in children))
+            elif name in ["⊤", "⊥"]:
+                variables = frozenset()
+            else:
+                variables = frozenset([name])
+            object.__setattr__(formula, "variables", variables)
+            object.__setattr__(formula, "size", 1 + sum(child.size for child in children))
+            cls.table[key] = formula
+        return formula
+
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Formula nodes are immutable.")
+
+
+    def __delattr__(self, key):
+        raise AttributeError("Formula nodes are immutable.")
+
+
+    def __hash__(self):
+        return self.hash
+
+
+    def __eq__(self, other):
+        return self is other
+
+
+    def __reduce__(self):
+        return Formula, (self.name, self.children)
+
+
+    def __repr__(self):
+        return f"Formula({get_formula_expression(self)!r})"
+
+
+    def __str__(self):
+        return get_formula_expression(self)
+
+
+    @property
+    def is_leaf(self):
+        return not self.children
+
+
+def node_to_formula(node, formulas=None):
+    if formulas is None:
+        formulas = {}
+    if node in formulas:
+        return formulas[node]
+    formula = Formula(node.name, [node_to_formula(child, formulas) for child in node.children])
+    formulas[node] = formula
+    return formula
+
+
+def formula_to_node(formula):
+    return Node(formula.name, children=[formula_to_node(child) for child in formula.children])
+
+
+def get_formula_expression(formula, expressions=None):
+    if expressions is None:
+        expressions = {}
+    if formula in expressions:
+        return expressions[formula]
+    if formula.is_leaf:
+        expression = formula.name
+    elif formula.name == "¬":
+        expression = f"(¬{get_formula_expression(formula.children[0], expressions)})"
+    else:
+        expression = f"({f' {formula.name} '.join(get_formula_expression(child, expressions) for child in formula.children)})"
+    expressions[formula] = expression
+    return expression
+
+
+def get_unique_subformulas(formula):
+    seen = set()
+    order = []
+
+    def traverse(f):
+        if f in seen:
+            return
+        seen.add(f)
+        for child in f.children:
+            traverse(child)
+        order.append(f)
+
+    traverse(formula)
+    return order
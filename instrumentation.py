@@ -0,0 +1,113 @@
+import time
+
+COUNTERS = ("nodes", "duplicate_node", "tokens", "clauses", "decisions", "propagations", "conflicts", "resolvents")
+counters = dict.fromkeys(COUNTERS, 0)
+
+
+def record_stats(stats):
+    for name in ["decisions", "propagations", "conflicts", "resolvents"]:
+        counters[name] += stats.get(name, 0)
+
+
+class NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+class Stage:
+    __slots__ = ("profiler", "name", "started", "start_counts", "child_seconds", "child_counts")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+
+    def __enter__(self):
+        self.child_seconds = 0.0
+        self.child_counts = dict.fromkeys(COUNTERS, 0)
+        self.start_counts = dict(counters)
+        self.profiler.stack.append(self)
+        self.started = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        counts = {name: counters[name] - self.start_counts[name] for name in COUNTERS}
+        self.profiler.stack.pop()
+        if self.profiler.stack:
+            parent = self.profiler.stack[-1]
+            parent.child_seconds += seconds
+            for name in COUNTERS:
+                parent.child_counts[name] += counts[name]
+        entry = self.profiler.stages.setdefault(self.name, {"calls": 0, "seconds": 0.0, **dict.fromkeys(COUNTERS, 0)})
+        entry["calls"] += 1
+        entry["seconds"] += seconds - self.child_seconds
+        for name in COUNTERS:
+            entry[name] += counts[name] - self.child_counts[name]
+        return False
+
+
+class Profiler:
+    __slots__ = ("enabled", "stages", "stack", "totals", "records")
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {}
+        self.stack = []
+        self.totals = {}
+        self.records = 0
+
+
+    def stage(self, name):
+        return Stage(self, name) if self.enabled else NULL_STAGE
+
+
+    def start_record(self):
+        self.stages = {}
+        self.stack = []
+
+
+    def finish_record(self):
+        stats = {name: {key: value for key, value in entry.items() if value} for name, entry in self.stages.items()}
+        self.stages = {}
+        return stats
+
+
+    def add_record(self, stats):
+        self.records += 1
+        for name, entry in stats.items():
+            total = self.totals.setdefault(name, {"calls": 0, "seconds": 0.0, **dict.fromkeys(COUNTERS, 0)})
+            for key, value in entry.items():
+                total[key] += value
+
+
+    def summary(self):
+        return {"records": self.records, "stages": self.totals}
+
+
+    def render_summary(self):
+        seconds = sum(entry["seconds"] for entry in self.totals.values()) or 1.0
+        used = [name for name in COUNTERS if any(entry[name] for entry in self.totals.values())]
+        lines = [f"Profile of {self.records} records:",
+                 f"{'stage':<16}{'calls':>9}{'seconds':>11}{'share':>8}" + "".join(f"{name:>16}" for name in used)]
+        for name, entry in sorted(self.totals.items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(f"{name:<16}{entry['calls']:>9}{entry['seconds']:>11.3f}{entry['seconds'] / seconds:>8.1%}"
+                         + "".join(f"{entry[counter]:>16}" for counter in used))
+        return "\n".join(lines)
+
+
+profiler = Profiler()
+
+
+def enable_profiling(enabled=True):
+    profiler.enabled = enabled
@@ -1,39 +1,97 @@
+import argparse
+import contextlib
 import json
+import os
+import signal
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import chain, islice
 from normal_form import *
-from resolution import resolution, create_clause_list, find_satisfying_interpretation, clausal_to_strong, \
-    strong_to_clausal, dpll, check_validity
+from resolution import resolution, find_satisfying_interpretation, clausal_to_strong, \
+    strong_to_clausal, dpll, check_validity, node_to_int_clauses, iter_int_clauses, solve_clause_stream, SatSession
+from bdd import check_equivalence_bdd, check_satisfiability_bdd, count_models
+from budget import Budget, ResourceExhausted
+from instrumentation import profiler, enable_profiling
+from results import Result, InterpretationResult
+from tracing import set_default_trace, default_tracer, SUMMARY, STEP, FULL
 from wff import *
 from utility import *
 
 
-def default_case(prop):
+MAX_SESSIONS = 64
+MAX_SESSION_QUERIES = 256
+sessions = {}
+
+
+def parse(prop):
+    with profiler.stage("parse"):
+        return relaxed_to_strong(prop, need_print=default_tracer.enabled(FULL))
+
+
+def get_session(premises):
+    key = tuple(sorted(set(premises)))
+    if key in sessions and sessions[key].queries >= MAX_SESSION_QUERIES:
+        print(f"The solver session loaded with the premises {set(key) if key else '{}'} answered {sessions[key].queries} queries; starting a fresh one.")
+        sessions.pop(key)
+    if key in sessions:
+        print(f"Reusing the solver session already loaded with the premises {set(key) if key else '{}'}.")
+        sessions[key] = sessions.pop(key)
+    else:
+        print(f"Loading the premises {set(key) if key else '{}'} into a new incremental solver session.")
+        session = SatSession()
+        for premise in key:
+            session.add_formula(parse(premise))
+        if len(sessions) >= MAX_SESSIONS:
+            sessions.pop(next(iter(sessions)))
+        sessions[key] = session
+    return sessions[key]
+
+
+def default_case(prop, incremental=False, budget=None):
     print(f"Started parsing the string: {prop}")
     if "⊨" in prop:
         print("Identified a possible consequence as a string.")
         parts = prop.replace(" ", "").split("⊨")
         left = parts[0].split(",")
         left_prop = "(" + "∧".join(f"({lft})" for lft in left) + ")" if len(left) > 1 else left[0]
-        node = transform_to_normal_form(relaxed_to_strong(left_prop), "cnf")
-        right_node = Node("¬", children=[relaxed_to_strong(parts[1])])
+        if incremental:
+            session = get_session([lft for lft in left if lft])
+            print(f"To check if {parts[1]} is a logical consequence of {left_prop}, the negation of {parts[1]} is tried against the loaded premises.")
+            verdict = session.entails(parse(parts[1]))
+            print(f"{parts[1]} is a logical consequence of {left_prop}.") if verdict else print(f"{parts[1]} is NOT a logical consequence of {left_prop}.")
+            print(end="\n\n")
+            return verdict
+        left_clauses, variables = node_to_int_clauses(parse(left_prop), budget=budget)
+        right_node = Node("¬", children=[parse(parts[1])])
         right_prop = get_node_expression(right_node)
         print(f"To check if {parts[1]} is a logical consequence of {left_prop}, the proposition ({left_prop + "∧" + right_prop})) has to be unsatisfiable.")
-        node.children = [*node.children, transform_to_normal_form(relaxed_to_strong(right_prop), "cnf")]
-        satisf = dpll(create_clause_list(node))
-        print(f"{parts[1]} is NOT a logical consequence of {left_prop}.") if satisf else print(f"{parts[1]} is a logical consequence of {left_prop}.")
+        right_clauses, variables = node_to_int_clauses(right_node, variables=variables, budget=budget)
+        satisfiable = dpll(left_clauses + right_clauses, variables, budget=budget)
+        verdict = not satisfiable
+        print(f"{parts[1]} is a logical consequence of {left_prop}.") if verdict else print(f"{parts[1]} is NOT a logical consequence of {left_prop}.")
 
     elif "∼" in prop:
         print("Identified a possible equivalence as a string.")
-        parts = [relaxed_to_strong(p) for p in prop.split("∼")]
+        parts = [parse(p) for p in prop.split("∼")]
+        verdict = True
         for p in parts[1:]:
-            if not compare_truth_tables(parts[0], p):
+            if default_tracer.enabled(STEP):
+                equivalent = compare_truth_tables(parts[0], p)
+            else:
+                print(f"Comparing {get_node_expression(parts[0])} and {get_node_expression(p)} through their reduced ordered BDDs.")
+                equivalent = check_equivalence_bdd(parts[0], p, budget)
+            if not equivalent:
                 print("The formulas are NOT equivalent.")
+                verdict = False
                 break
 
     else:
-        node = relaxed_to_strong(prop)
+        node = parse(prop)
         print("The string is a wwf.\n")
         return node
     print(end="\n\n")
+    return verdict
 
 
 import re
@@ -46,11 +104,15 @@ def convert_instructions(instr):
         ("negation normal form",): "nnf",
         ("conjunctive normal form",): "cnf",
         ("disjunctive normal form",): "dnf",
+        ("minimal conjunctive normal form", "minimal cnf", "min cnf"): "min_cnf",
+        ("minimal disjunctive normal form", "minimal dnf", "min dnf"): "min_dnf",
+        ("tseitin", "tseitin normal form", "definitional normal form"): "tseitin",
         ("resolution davis putnam", "davis putnam", "resolution dp", "dp"): "res_dp",
         ("resolution",): "res",
         ("satisfying truth valuation",): "stv",
         ("clause formula", "clausal formula", "clausal form"): "clausal_formula",
         ("formula",): "formula",
+        ("model count", "count models", "count the models", "number of models"): "model_count",
         ("davis putnam logemann loveland", "check satisfiability", "check satisf", "satisfiability", "satisf"): "dpll",
     }
 
@@ -69,74 +131,356 @@ def convert_instructions(instr):
     return instr
 
 
-def assert_function(node, fnc):
+def solve_clauses(node, solver, budget=None, **kwargs):
+    if kwargs.get("backend") == "bdd" and solver in [dpll, find_satisfying_interpretation]:
+        result = check_satisfiability_bdd(node, budget)
+        if solver == find_satisfying_interpretation:
+            return InterpretationResult(result.satisfiable, result.model, "bdd", result.stats, result.seconds)
+        return result
+    if solver == dpll and kwargs.get("backend") == "cdcl" and not default_tracer.enabled(SUMMARY):
+        variables = []
+        return solve_clause_stream(iter_int_clauses(node, variables, budget=budget), variables, budget=budget)
+    clauses, variables = node_to_int_clauses(node, budget=budget)
+    return solver(clauses, variables=variables, budget=budget, **kwargs)
+
+
+def assert_function(node, fnc, backend="dpll", incremental=False, budget=None):
     return {
         "wff": lambda: default_case(get_node_expression(node)),
         "truth_table": lambda: get_printed_truth_table(node),
-        "check_validity": lambda: check_validity(node),
-        "nnf": lambda: transform_to_normal_form(node, "nnf"),
-        "cnf": lambda: transform_to_normal_form(node, "cnf"),
-        "dnf": lambda: transform_to_normal_form(node, "dnf"),
-        "res_dp": lambda: resolution(create_clause_list(node), True),
-        "res": lambda: resolution(create_clause_list(node), False),
-        "dpll": lambda: dpll(create_clause_list(node)),
-        "stv": lambda: find_satisfying_interpretation(create_clause_list(node)),
+        "check_validity": lambda: check_validity(node, backend, get_session([]) if incremental else None, budget=budget),
+        "nnf": lambda: transform_to_normal_form(node, "nnf", budget=budget),
+        "cnf": lambda: transform_to_normal_form(node, "cnf", budget=budget),
+        "dnf": lambda: transform_to_normal_form(node, "dnf", budget=budget),
+        "min_cnf": lambda: transform_to_normal_form(node, "min_cnf", budget=budget),
+        "min_dnf": lambda: transform_to_normal_form(node, "min_dnf", budget=budget),
+        "tseitin": lambda: get_node_expression(transform_to_normal_form(node, "tseitin", budget=budget)),
+        "res_dp": lambda: solve_clauses(node, resolution, budget, dp=True),
+        "res": lambda: solve_clauses(node, resolution, budget, dp=False),
+        "dpll": lambda: solve_clauses(node, dpll, budget, backend=backend),
+        "stv": lambda: solve_clauses(node, find_satisfying_interpretation, budget, backend=backend),
         "clausal_formula": lambda: strong_to_clausal(node),
         "formula": lambda: get_node_expression(node),
+        "model_count": lambda: count_models(node, budget),
     }[fnc]
 
 
-try:
-    with open("propositions.json", "r", encoding="utf-8") as file:
-        input_file = json.load(file)
-    print("Data loaded successfully:", end="\n\n")
-    for element in input_file:
-        try:
-            proposition = element["proposition"]
-            if "instructions" not in element or element["instructions"] is None or element["instructions"] == "":
-                print(f"Found no specific instructions for the proposition {proposition}. Running the default verifications.")
-                default_case(proposition)
+def to_json_value(value):
+    if isinstance(value, Node):
+        return get_node_expression(value)
+    if isinstance(value, Result):
+        return to_json_value(value.to_dict())
+    if value is None or type(value) in [bool, int, float, str]:
+        return value
+    if type(value) == dict:
+        return {str(key): to_json_value(item) for key, item in value.items()}
+    if type(value) in [list, tuple, set, frozenset]:
+        return [to_json_value(item) for item in value]
+    return str(value)
+
+
+def process_element(element, default_trace="full", default_budget=None):
+    result = {"proposition": None, "formula": None, "verdict": None, "results": [], "interpretations": [], "error": None, "exhausted": None, "stats": None}
+    profiler.start_record()
+    try:
+        if type(element) != dict or "proposition" not in element:
+            raise Exception("Proposition not found. Please ensure each element has a 'proposition' key.")
+        proposition = element["proposition"]
+        result["proposition"] = proposition
+        set_default_trace(element.get("trace", default_trace))
+        limits = {**(default_budget or {}), **element.get("budget", {})}
+        budget = Budget(**limits) if limits else None
+        if "instructions" not in element or element["instructions"] is None or element["instructions"] == "":
+            print(f"Found no specific instructions for the proposition {proposition}. Running the default verifications.")
+            root = default_case(proposition, element.get("incremental", False), budget)
+        else:
+            instructions = convert_instructions(element["instructions"].lower())
+
+            if "{" in proposition: #add proper verification for clausal form
+                print(f"A tree structure has to be build from the set of clauses: {proposition}.")
+                root = clausal_to_strong(proposition)
+                print_tree(root,1)
+                root = transform_to_normal_form(root, "cnf")
+                print_tree(root,1)
+                print()
             else:
-                instructions = convert_instructions(element["instructions"].lower())
-
-                if "{" in proposition: #add proper verification for clausal form
-                    print(f"A tree structure has to be build from the set of clauses: {proposition}.")
-                    root = clausal_to_strong(proposition)
-                    print_tree(root,1)
-                    root = transform_to_normal_form(root, "cnf")
-                    print_tree(root,1)
-                    print()
-                else:
-                    instructions.pop(0) if instructions[0] == "wff" else print("First it is required to check if the inputted string is a wff.")
-                    root = default_case(proposition)
+                instructions.pop(0) if instructions[0] == "wff" else print("First it is required to check if the inputted string is a wff.")
+                root = default_case(proposition, element.get("incremental", False), budget)
+
+            if type(root) == bool:
+                result["verdict"] = root
+                root = None
 
-                if root is None and instructions:
-                    raise Exception("Cannot receive more instructions for consequences or equivalences.")
+            if root is None and instructions:
+                raise Exception("Cannot receive more instructions for consequences or equivalences.")
 
-                intermediate_results = {}
+            intermediate_results = {}
 
-                for ins in instructions:
-                    print(f"Current instruction: {ins}")
-                    if ins in intermediate_results:
-                        print("Already calculated this.")
-                        print(intermediate_results[ins])
+            for ins in instructions:
+                print(f"Current instruction: {ins}")
+                if ins in intermediate_results:
+                    print("Already calculated this.")
+                    print(intermediate_results[ins])
+                else:
+                    with profiler.stage(ins):
+                        res = assert_function(duplicate_node(root), ins, element.get("backend", "dpll"), element.get("incremental", False), budget)()
+                    intermediate_results[ins] = res
+                    if ins in ["wff", "nnf", "cnf", "dnf", "min_cnf", "min_dnf"]:
+                        root = res
+                        intermediate_results = {}
                     else:
-                        res = assert_function(duplicate_node(root), ins)()
-                        intermediate_results[ins] = res
-                        if ins in ["wff", "nnf", "cnf", "dnf"]:
-                            root = res
-                            intermediate_results = {}
-                        else:
-                            print(res)
-                    print(end="\n")
-            print(end="\n\n")
+                        print(res)
+                result["results"].append({"instruction": ins, "result": to_json_value(intermediate_results.get(ins, root))})
+                print(end="\n")
+
+        if type(root) == bool:
+            result["verdict"] = root
+            root = None
+        if root is not None:
+            result["formula"] = get_node_expression(root)
+
+        if element.get("interpretations") and root is not None:
+            compiled = compile_formula(root)
+            for interpretation, value in zip(element["interpretations"], compiled.evaluate_many(element["interpretations"])):
+                print(f"Under the interpretation {interpretation} the proposition is {value}.")
+                result["interpretations"].append({"interpretation": to_json_value(interpretation), "value": to_json_value(value)})
+        print(end="\n\n")
+    except ResourceExhausted as e:
+        print(f"Error: {e}")
+        result["error"] = str(e)
+        result["exhausted"] = e.to_dict()
+    except Exception as e:
+        print(f"Error: {e}")
+        result["error"] = str(e).strip()
+    if profiler.enabled:
+        result["stats"] = profiler.finish_record()
+    return result
+
+
+def iter_jsonl(file, first_line=""):
+    for line in chain([first_line], file):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield e
+
+
+class InputFormatError(Exception):
+    pass
+
+
+def iter_json_array(file, buffer="", chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    buffer = buffer.lstrip()
+    eof = False
+    while not buffer and not eof:
+        buffer = file.read(chunk_size).lstrip()
+        eof = not buffer
+    if not buffer.startswith("["):
+        raise InputFormatError("Expected a top-level JSON array.")
+    position = 1
+    expected = "first"
+    count = 0
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n":
+            position += 1
+        if position < len(buffer):
+            char = buffer[position]
+            if expected == "separator":
+                if char == "]":
+                    return
+                if char != ",":
+                    raise InputFormatError(f"Expected ',' or ']' after element {count} of the JSON array, found {char!r}.")
+                position += 1
+                expected = "element"
+                continue
+            if char == "]":
+                if expected == "first":
+                    return
+                raise InputFormatError(f"Expected an element after the ',' following element {count} of the JSON array.")
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+                if end < len(buffer) or eof:
+                    yield element
+                    count += 1
+                    position = end
+                    expected = "separator"
+                    continue
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise InputFormatError(f"Element {count + 1} of the JSON array is not valid JSON: {e.msg}.")
+        elif eof:
+            raise InputFormatError("The JSON array is not closed.")
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def iter_records(file, format="auto"):
+    first = file.read(1)
+    while first.isspace():
+        first = file.read(1)
+    if not first:
+        return
+    if format == "auto":
+        format = "json" if first == "[" else "jsonl"
+    if format == "json":
+        yield from iter_json_array(file, first)
+    else:
+        yield from iter_jsonl(file, first + file.readline())
+
+
+class RecordTimeout(Exception):
+    pass
+
+
+def raise_timeout(signum, frame):
+    raise RecordTimeout("The record exceeded its time limit.")
+
+
+def error_result(message):
+    return {"proposition": None, "formula": None, "verdict": None, "results": [], "interpretations": [], "error": message, "exhausted": None, "stats": None}
+
+
+def process_record(index, element, default_trace="silent", timeout=None, default_budget=None):
+    if isinstance(element, json.JSONDecodeError):
+        print(f"Error: Failed to decode JSON: {element}")
+        return {"index": index, **error_result(f"Failed to decode JSON: {element}")}
+    if not timeout or not hasattr(signal, "SIGALRM"):
+        return {"index": index, **process_element(element, default_trace, default_budget)}
+    previous = signal.signal(signal.SIGALRM, raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = process_element(element, default_trace, default_budget)
+    except RecordTimeout as e:
+        result = error_result(str(e))
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+    return {"index": index, **result}
+
+
+def process_chunk(chunk, default_trace="silent", timeout=None, default_budget=None):
+    return [process_record(index, element, default_trace, timeout, default_budget) for index, element in chunk]
+
+
+def init_worker(log, profile=False):
+    sys.stdout = sys.stderr if log else open(os.devnull, "w", encoding="utf-8")
+    enable_profiling(profile)
+
+
+def iter_chunks(records, size):
+    records = enumerate(records)
+    chunk = list(islice(records, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(records, size))
+
+
+def iter_parallel_results(records, default_trace, timeout, default_budget, workers, chunk_size=32, ordered=True, log=False):
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(log, profiler.enabled)) as executor:
+        pending = {}
+        queue = deque()
+        for chunk in iter_chunks(records, chunk_size):
+            future = executor.submit(process_chunk, chunk, default_trace, timeout, default_budget)
+            pending[future] = chunk
+            queue.append(future)
+            if len(pending) >= 2 * workers:
+                done = [queue[0]] if ordered else wait(pending, return_when=FIRST_COMPLETED).done
+                yield from collect_chunks(done, pending, queue)
+        while pending:
+            done = [queue[0]] if ordered else wait(pending, return_when=FIRST_COMPLETED).done
+            yield from collect_chunks(done, pending, queue)
+
+
+def collect_chunks(done, pending, queue):
+    for future in done:
+        chunk = pending.pop(future)
+        queue.remove(future)
+        try:
+            yield from future.result()
         except Exception as e:
-            print(f"Error: {e}")
-        except KeyError:
-            print("Proposition not found. Please ensure each element has a 'proposition' key.")
-except FileNotFoundError:
-    print("File not found. Ensure 'propositions.json' is in the correct directory.")
-except json.JSONDecodeError:
-    print("Failed to decode JSON. Ensure the JSON syntax is correct.")
-except Exception as e:
-    print("An error occurred:", e)
\ No newline at end of file
+            for index, element in chunk:
+                yield {"index": index, **error_result(f"The worker processing this record failed: {e}")}
+
+
+def run_batch(source, destination, format="auto", default_trace="silent", log=None, workers=1, ordered=True, timeout=None, chunk_size=32,
+              default_budget=None):
+    count = errors = 0
+    records = iter_records(source, format)
+    with contextlib.redirect_stdout(log):
+        if workers > 1:
+            results = iter_parallel_results(records, default_trace, timeout, default_budget, workers, chunk_size, ordered, log is sys.stderr)
+        else:
+            results = (process_record(index, element, default_trace, timeout, default_budget) for index, element in enumerate(records))
+        for result in results:
+            destination.write(json.dumps(result, ensure_ascii=False) + "\n")
+            count += 1
+            errors += result["error"] is not None
+            if result["stats"] is not None:
+                profiler.add_record(result["stats"])
+    return count, errors
+
+
+def run_file(path, default_trace="full", default_budget=None):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            input_file = json.load(file)
+        print("Data loaded successfully:", end="\n\n")
+        for element in input_file:
+            result = process_element(element, default_trace, default_budget)
+            if result["stats"] is not None:
+                profiler.add_record(result["stats"])
+        if profiler.enabled:
+            print(profiler.render_summary())
+    except FileNotFoundError:
+        print(f"File not found. Ensure '{path}' is in the correct directory.")
+    except json.JSONDecodeError:
+        print("Failed to decode JSON. Ensure the JSON syntax is correct.")
+    except Exception as e:
+        print("An error occurred:", e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the verifications requested for each proposition of a JSON file.")
+    parser.add_argument("input", nargs="?", default="propositions.json", help="JSON array or JSON Lines file, '-' for stdin in batch mode")
+    parser.add_argument("--batch", action="store_true", help="stream the records and write one JSON result per record")
+    parser.add_argument("--output", default="-", help="file receiving the batch results, '-' for stdout")
+    parser.add_argument("--format", choices=["auto", "json", "jsonl"], default="auto", help="input format of the batch mode")
+    parser.add_argument("--trace", help="trace level for records without one (default: full, silent in batch mode)")
+    parser.add_argument("--log", action="store_true", help="in batch mode, write the narration to stderr instead of discarding it")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes of the batch mode")
+    parser.add_argument("--chunk-size", type=int, default=32, help="records sent to a worker at a time")
+    parser.add_argument("--unordered", action="store_true", help="write the results as soon as they are ready instead of in input order")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per record (needs SIGALRM, so not on Windows)")
+    parser.add_argument("--max-clauses", type=int, help="budget: largest clause set a conversion or solver may build")
+    parser.add_argument("--max-nodes", type=int, help="budget: tree nodes the cnf/dnf distribution, or BDD nodes, a record may create")
+    parser.add_argument("--max-seconds", type=float, help="budget: seconds per record, checked cooperatively by the conversions and solvers")
+    parser.add_argument("--max-resolvents", type=int, help="budget: resolvents the resolution may generate")
+    parser.add_argument("--profile", action="store_true", help="time each pipeline stage, add per-record stats and print a summary")
+    args = parser.parse_args()
+    enable_profiling(args.profile)
+    limits = {key: getattr(args, key) for key in ["max_clauses", "max_nodes", "max_seconds", "max_resolvents"] if getattr(args, key) is not None}
+
+    if not args.batch:
+        run_file(args.input, args.trace or "full", limits)
+        return
+
+    with contextlib.ExitStack() as stack:
+        source = sys.stdin if args.input == "-" else stack.enter_context(open(args.input, "r", encoding="utf-8"))
+        destination = sys.stdout if args.output == "-" else stack.enter_context(open(args.output, "w", encoding="utf-8"))
+        log = sys.stderr if args.log else stack.enter_context(open(os.devnull, "w", encoding="utf-8"))
+        try:
+            count, errors = run_batch(source, destination, args.format, args.trace or "silent", log,
+                                      args.workers, not args.unordered, args.timeout, args.chunk_size, limits)
+        except InputFormatError as e:
+            print(f"Failed to read {args.input}: {e}", file=sys.stderr)
+            sys.exit(1)
+    print(f"Processed {count} records, {errors} with errors.", file=sys.stderr)
+    if profiler.enabled:
+        print(profiler.render_summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+EXACT_VARIABLES = 12
+EXACT_COVER_PRIMES = 40
+
+
+def get_minterms(column):
+    minterms = []
+    row = 0
+    while column:
+        if column & 1:
+            minterms.append(row)
+        column >>= 1
+        row += 1
+    return minterms
+
+
+def count_literals(cube):
+    return bin(cube[0]).count("1")
+
+
+def get_cover_cost(cover):
+    return len(cover), sum(count_literals(cube) for cube in cover)
+
+
+def covers_minterm(cube, minterm):
+    return minterm & cube[0] == cube[1]
+
+
+def contains(first, second):
+    return not first[0] & ~second[0] and not (first[1] ^ second[1]) & first[0]
+
+
+def clauses_to_cubes(clauses, variables):
+    count = len(variables)
+    bits = {var: 1 << (count - i - 1) for i, var in enumerate(variables)}
+    cubes = []
+    for clause in clauses:
+        care = value = 0
+        for literal in clause:
+            bit = bits[literal[1:] if literal[0] == "¬" else literal]
+            care |= bit
+            if literal[0] != "¬":
+                value |= bit
+        cubes.append((care, value))
+    return cubes
+
+
+def cube_to_literals(cube, variables):
+    count = len(variables)
+    care, value = cube
+    literals = []
+    for i, var in enumerate(variables):
+        bit = 1 << (count - i - 1)
+        if care & bit:
+            literals.append(var if value & bit else f"¬{var}")
+    return frozenset(literals)
+
+
+def get_prime_implicants(minterms, count, budget=None, stage="the prime implicant generation"):
+    full = (1 << count) - 1
+    current = {(full, minterm) for minterm in minterms}
+    primes = []
+    while current:
+        if budget is not None:
+            budget.check_clauses(len(current), stage)
+        groups = {}
+        for care, value in current:
+            groups.setdefault(care, set()).add(value)
+        merged = set()
+        used = set()
+        for care, values in groups.items():
+            for value in values:
+                bits = care
+                while bits:
+                    bit = bits & -bits
+                    bits ^= bit
+                    if not value & bit and value | bit in values:
+                        merged.add((care ^ bit, value))
+                        used.add((care, value))
+                        used.add((care, value | bit))
+        primes.extend(sorted(cube for cube in current if cube not in used))
+        current = merged
+    return primes
+
+
+def select_cover(primes, minterms, budget=None, stage="the prime implicant cover"):
+    candidates = {minterm: [prime for prime in primes if covers_minterm(prime, minterm)] for minterm in minterms}
+    chosen = []
+    uncovered = set(minterms)
+    for minterm in minterms:
+        if len(candidates[minterm]) == 1 and candidates[minterm][0] not in chosen:
+            chosen.append(candidates[minterm][0])
+    for prime in chosen:
+        uncovered = {minterm for minterm in uncovered if not covers_minterm(prime, minterm)}
+    remaining = sorted({prime for minterm in uncovered for prime in candidates[minterm]}, key=count_literals)
+    if not uncovered:
+        return chosen
+    if len(remaining) <= EXACT_COVER_PRIMES:
+        return chosen + get_minimum_cover(remaining, uncovered, candidates, budget, stage)
+    return chosen + get_greedy_cover(remaining, uncovered)
+
+
+def get_minimum_cover(primes, uncovered, candidates, budget=None, stage="the prime implicant cover"):
+    covered = {prime: frozenset(minterm for minterm in uncovered if covers_minterm(prime, minterm)) for prime in primes}
+    best = get_greedy_cover(primes, uncovered)
+    best_cost = get_cover_cost(best)
+
+    def search(uncovered, chosen, cost):
+        nonlocal best, best_cost
+        if budget is not None:
+            budget.check_time(stage)
+        if not uncovered:
+            if cost < best_cost:
+                best, best_cost = list(chosen), cost
+            return
+        if cost[0] + 1 > best_cost[0]:
+            return
+        minterm = min(uncovered, key=lambda m: len(candidates[m]))
+        for prime in sorted(candidates[minterm], key=lambda p: (-len(covered[p] & uncovered), count_literals(p))):
+            chosen.append(prime)
+            search(uncovered - covered[prime], chosen, (cost[0] + 1, cost[1] + count_literals(prime)))
+            chosen.pop()
+
+    search(frozenset(uncovered), [], (0, 0))
+    return best
+
+
+def get_greedy_cover(primes, uncovered):
+    uncovered = set(uncovered)
+    chosen = []
+    while uncovered:
+        prime = max(primes, key=lambda p: (sum(1 for minterm in uncovered if covers_minterm(p, minterm)), -count_literals(p)))
+        chosen.append(prime)
+        uncovered = {minterm for minterm in uncovered if not covers_minterm(prime, minterm)}
+    return chosen
+
+
+def quine_mccluskey(column, count, budget=None):
+    minterms = get_minterms(column)
+    primes = get_prime_implicants(minterms, count, budget)
+    return select_cover(primes, minterms, budget)
+
+
+def cofactor(cover, cube):
+    care, value = cube
+    return [(c & ~care, v & ~care) for c, v in cover if not (v ^ value) & c & care]
+
+
+def is_tautology(cover, budget=None, stage="the espresso minimisation"):
+    if any(not care for care, value in cover):
+        return True
+    if not cover:
+        return False
+    if budget is not None:
+        budget.check_time(stage)
+    positive = negative = 0
+    for care, value in cover:
+        positive |= care & value
+        negative |= care & ~value
+    unate = (positive ^ negative) & (positive | negative)
+    if unate:
+        return is_tautology([(care, value) for care, value in cover if not care & unate], budget, stage)
+    occurrences = {}
+    for care, value in cover:
+        bits = care
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            occurrences[bit] = occurrences.get(bit, 0) + 1
+    bit = max(occurrences, key=lambda b: (occurrences[b], b))
+    return is_tautology(cofactor(cover, (bit, bit)), budget, stage) and is_tautology(cofactor(cover, (bit, 0)), budget, stage)
+
+
+def remove_contained(cover):
+    kept = []
+    for cube in sorted(set(cover), key=count_literals):
+        if not any(contains(other, cube) for other in kept):
+            kept.append(cube)
+    return kept
+
+
+def expand(cover, budget=None, stage="the espresso minimisation"):
+    expanded = []
+    for cube in sorted(cover, key=count_literals):
+        if any(contains(other, cube) for other in expanded):
+            continue
+        care, value = cube
+        bits = care
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            candidate = (care & ~bit, value & ~bit)
+            if is_tautology(cofactor(cover, candidate), budget, stage):
+                care, value = candidate
+        if budget is not None:
+            budget.check_time(stage)
+        expanded.append((care, value))
+    return remove_contained(expanded)
+
+
+def irredundant(cover, budget=None, stage="the espresso minimisation"):
+    cover = sorted(cover, key=count_literals, reverse=True)
+    kept = list(cover)
+    for cube in cover:
+        others = [other for other in kept if other != cube]
+        if is_tautology(cofactor(others, cube), budget, stage):
+            kept = others
+    return kept
+
+
+def espresso(on, budget=None):
+    cover = remove_contained(on)
+    cost = get_cover_cost(cover)
+    while True:
+        cover = irredundant(expand(cover, budget), budget)
+        new_cost = get_cover_cost(cover)
+        if new_cost >= cost:
+            return cover
+        cost = new_cost
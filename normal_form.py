@@ -1,165 +1,515 @@
 import itertools
+from budget import ResourceExhausted, get_budget
+from formula import Formula, node_to_formula, formula_to_node, get_formula_expression, get_unique_subformulas
+from instrumentation import counters, profiler
+from minimize import EXACT_VARIABLES, quine_mccluskey, espresso, clauses_to_cubes, cube_to_literals
+from tracing import get_tracer, SUMMARY, STEP, FULL
 from utility import *
 
 
-def transform_to_nnf(node, indent):
+def transform_to_nnf(node, indent, trace=None):
+    trace = get_tracer(trace)
     if node.name == "¬":
         child = node.children[0]
 
         if child.name == "¬":
-            print(f"{"\t"*(indent-1)}Transformed this node:")
-            print_tree(node, indent)
-            print(f"{"\t"*(indent-1)}Into its equivalent tree representation:")
-            print_tree(child.children[0], indent)
-            return transform_to_nnf(child.children[0], indent+1)
+            trace.step(lambda: f"{"\t"*(indent-1)}Transformed this node:")
+            trace.tree(node, indent)
+            trace.step(lambda: f"{"\t"*(indent-1)}Into its equivalent tree representation:")
+            trace.tree(child.children[0], indent)
+            return transform_to_nnf(child.children[0], indent+1, trace)
 
         elif child.name == "∧":
-            print(f"{"\t"*(indent-1)}Transformed this node:")
-            print_tree(node, indent)
+            trace.step(lambda: f"{"\t"*(indent-1)}Transformed this node:")
+            trace.tree(node, indent)
             new_node = Node("∨", parent=node.parent)
             for grandchild in child.children:
                 negated_child = Node("¬", parent=new_node)
-                negated_child.children = [transform_to_nnf(grandchild, indent)]
-            print(f"{"\t"*(indent-1)}Into its equivalent tree representation:")
-            print_tree(new_node, indent)
-            return transform_to_nnf(new_node, indent+1)
+                negated_child.children = [transform_to_nnf(grandchild, indent, trace)]
+            trace.step(lambda: f"{"\t"*(indent-1)}Into its equivalent tree representation:")
+            trace.tree(new_node, indent)
+            return transform_to_nnf(new_node, indent+1, trace)
 
         elif child.name == "∨":
-            print(f"{"\t"*(indent-1)}Transformed this node:")
-            print_tree(node, indent)
+            trace.step(lambda: f"{"\t"*(indent-1)}Transformed this node:")
+            trace.tree(node, indent)
             new_node = Node("∧", parent=node.parent)
             for grandchild in child.children:
                 negated_child = Node("¬", parent=new_node)
-                negated_child.children = [transform_to_nnf(grandchild, indent)]
-            print(f"{"\t"*(indent-1)}Into its equivalent tree representation:")
-            print_tree(new_node, indent)
-            return transform_to_nnf(new_node, indent+1)
+                negated_child.children = [transform_to_nnf(grandchild, indent, trace)]
+            trace.step(lambda: f"{"\t"*(indent-1)}Into its equivalent tree representation:")
+            trace.tree(new_node, indent)
+            return transform_to_nnf(new_node, indent+1, trace)
 
         elif child.name == "⇒":
-            print(f"{"\t"*(indent-1)}Transformed this node:")
-            print_tree(node, indent)
+            trace.step(lambda: f"{"\t"*(indent-1)}Transformed this node:")
+            trace.tree(node, indent)
             left, right = child.children
             new_node = Node("∧", parent=node.parent)
-            negated_right = Node("¬", parent=new_node, children=[transform_to_nnf(duplicate_node(right), indent)])
-            new_node.children = [transform_to_nnf(duplicate_node(left), indent), negated_right]
-            print(f"{"\t"*(indent-1)}Into its equivalent tree representation:")
-            print_tree(new_node, indent)
-            return transform_to_nnf(new_node, indent+1)
+            negated_right = Node("¬", parent=new_node, children=[transform_to_nnf(duplicate_node(right), indent, trace)])
+            new_node.children = [transform_to_nnf(duplicate_node(left), indent, trace), negated_right]
+            trace.step(lambda: f"{"\t"*(indent-1)}Into its equivalent tree representation:")
+            trace.tree(new_node, indent)
+            return transform_to_nnf(new_node, indent+1, trace)
 
         elif child.name == "⇔":
-            print(f"{"\t"*(indent-1)}Transformed this node:")
-            print_tree(node, indent)
+            trace.step(lambda: f"{"\t"*(indent-1)}Transformed this node:")
+            trace.tree(node, indent)
             left, right = child.children
-            left_neg = Node("¬", parent=node.parent, children=[transform_to_nnf(duplicate_node(left), indent)])
-            right_neg = Node("¬", parent=node.parent, children=[transform_to_nnf(duplicate_node(right), indent)])
+            left_neg = Node("¬", parent=node.parent, children=[transform_to_nnf(duplicate_node(left), indent, trace)])
+            right_neg = Node("¬", parent=node.parent, children=[transform_to_nnf(duplicate_node(right), indent, trace)])
             new_node = Node("∨", parent=node.parent)
             new_node.children = [
-                Node("∧", parent=node.parent, children=[transform_to_nnf(duplicate_node(left), indent), right_neg]),
-                Node("∧", parent=node.parent, children=[left_neg, transform_to_nnf(duplicate_node(right), indent)]),
+                Node("∧", parent=node.parent, children=[transform_to_nnf(duplicate_node(left), indent, trace), right_neg]),
+                Node("∧", parent=node.parent, children=[left_neg, transform_to_nnf(duplicate_node(right), indent, trace)]),
             ]
-            print(f"{"\t"*(indent-1)}Into its equivalent tree representation:")
-            print_tree(new_node, indent)
-            return transform_to_nnf(new_node, indent+1)
+            trace.step(lambda: f"{"\t"*(indent-1)}Into its equivalent tree representation:")
+            trace.tree(new_node, indent)
+            return transform_to_nnf(new_node, indent+1, trace)
 
         else:
             return duplicate_node(node)
 
     elif node.name == "⇒":
-        print(f"{"\t"*(indent-1)}Transformed this node:")
-        print_tree(node, indent)
+        trace.step(lambda: f"{"\t"*(indent-1)}Transformed this node:")
+        trace.tree(node, indent)
         left, right = node.children
         new_node = Node("∨", parent=node.parent)
-        negated_left = Node("¬", parent=new_node, children=[transform_to_nnf(duplicate_node(left), indent+1)])
-        new_node.children = [duplicate_node(negated_left), transform_to_nnf(duplicate_node(right), indent+1)]
-        print(f"{"\t"*(indent-1)}Into its equivalent tree representation:")
-        print_tree(new_node, indent)
-        return transform_to_nnf(new_node, indent+1)
+        negated_left = Node("¬", parent=new_node, children=[transform_to_nnf(duplicate_node(left), indent+1, trace)])
+        new_node.children = [duplicate_node(negated_left), transform_to_nnf(duplicate_node(right), indent+1, trace)]
+        trace.step(lambda: f"{"\t"*(indent-1)}Into its equivalent tree representation:")
+        trace.tree(new_node, indent)
+        return transform_to_nnf(new_node, indent+1, trace)
 
     elif node.name == "⇔":
-        print(f"{"\t"*(indent-1)}Transformed this node:")
-        print_tree(node, indent)
+        trace.step(lambda: f"{"\t"*(indent-1)}Transformed this node:")
+        trace.tree(node, indent)
         left, right = node.children
         left_impl = Node("⇒", parent=node.parent, children=[duplicate_node(left), duplicate_node(right)])
         right_impl = Node("⇒", parent=node.parent, children=[duplicate_node(right), duplicate_node(left)])
         new_node = Node("∧", parent=node.parent, children=[left_impl, right_impl])
-        print(f"{"\t"*(indent-1)}Into its equivalent tree representation:")
-        print_tree(new_node, indent)
-        return transform_to_nnf(new_node, indent+1)
+        trace.step(lambda: f"{"\t"*(indent-1)}Into its equivalent tree representation:")
+        trace.tree(new_node, indent)
+        return transform_to_nnf(new_node, indent+1, trace)
 
     elif node.name in ["∧", "∨"]:
-        node.children = [transform_to_nnf(child, indent) for child in node.children]
+        node.children = [transform_to_nnf(child, indent, trace) for child in node.children]
 
     return Node(node.name, parent=node.parent, children=node.children)
 
 
-def transform_to_normal_form(node, conversion_type):
+def get_nnf_formula(formula):
+    positives = {}
+    negatives = {}
+    complements = {}
+
+    def complement(f):
+        if f not in complements:
+            if f.name in ["∧", "∨"]:
+                complements[f] = Formula("∨" if f.name == "∧" else "∧", [complement(child) for child in f.children])
+            elif f.name == "¬":
+                complements[f] = f.children[0]
+            else:
+                complements[f] = Formula("¬", [f])
+        return complements[f]
+
+    def positive(f):
+        if f not in positives:
+            if f.is_leaf:
+                positives[f] = f
+            elif f.name == "¬":
+                positives[f] = negative(f.children[0])
+            elif f.name in ["∧", "∨"]:
+                positives[f] = Formula(f.name, [positive(child) for child in f.children])
+            elif f.name == "⇒":
+                left, right = f.children
+                positives[f] = Formula("∨", [complement(positive(left)), positive(right)])
+            elif f.name == "⇔":
+                left, right = f.children
+                positives[f] = Formula("∧", [Formula("∨", [complement(positive(left)), positive(right)]),
+                                             Formula("∨", [complement(positive(right)), positive(left)])])
+            else:
+                raise Exception(f"Unknown connective {f.name}.")
+        return positives[f]
+
+    def negative(f):
+        if f not in negatives:
+            if f.name == "¬":
+                negatives[f] = positive(f.children[0])
+            elif f.name == "⇔":
+                left, right = f.children
+                negatives[f] = Formula("∨", [Formula("∧", [positive(left), complement(positive(right))]),
+                                             Formula("∧", [complement(positive(left)), positive(right)])])
+            else:
+                negatives[f] = complement(positive(f))
+        return negatives[f]
+
+    return positive(formula)
+
+
+def transform_to_normal_form(node, conversion_type, trace=None, budget=None):
+    trace = get_tracer(trace)
+    budget = get_budget(budget)
     conversion_type = conversion_type.lower()
     if conversion_type == "nnf":
-        print("Converting the tree formula to nnf.")
-        node = transform_to_nnf(node, 2)
-        print("This is the raw nnf formula; now simplifying it.")
-        print_tree(node, 1)
-        s_node = check_simplified_integrity(simplify_tree(duplicate_node(node)))
-        if get_node_expression(s_node) == get_node_expression(node):
-            print("No changes needed.")
-            print(f"The nnf formula is: {get_node_expression(s_node)}")
+        trace.summary("Converting the tree formula to nnf.")
+        if trace.enabled(STEP):
+            node = transform_to_nnf(node, 2, trace)
         else:
-            print("This is the final nnf.")
-            print_tree(s_node, 1)
-            print(f"With the formula: {get_node_expression(s_node)}")
+            node = formula_to_node(get_nnf_formula(node_to_formula(node)))
+        trace.step("This is the raw nnf formula; now simplifying it.")
+        trace.tree(node, 1)
+        s_node = check_simplified_integrity(simplify_tree(duplicate_node(node) if trace.enabled(SUMMARY) else node))
+        if trace.enabled(SUMMARY):
+            if get_node_expression(s_node) == get_node_expression(node):
+                trace.summary("No changes needed.")
+                trace.summary(lambda: f"The nnf formula is: {get_node_expression(s_node)}")
+            else:
+                trace.summary("This is the final nnf.")
+                trace.tree(s_node, 1, FULL)
+                trace.summary(lambda: f"With the formula: {get_node_expression(s_node)}")
 
         return s_node
 
     elif conversion_type in ["dnf", "cnf"]:
-        node = transform_to_normal_form(node, "nnf")
+        with profiler.stage("nnf"):
+            node = transform_to_normal_form(node, "nnf", trace)
         if conversion_type == "dnf":
             op_list = ["∧", "∨"]
         else:
             op_list = ["∨", "∧"]
 
-        print(f"Started converting to {conversion_type}:")
+        trace.summary(lambda: f"Started converting to {conversion_type}:")
+        created = 0
 
         def convert(node):
+            nonlocal created
             if node is None:
                 return None
             if node.name == op_list[0]:
                 if op_list[1] in [child.name for child in node.children]:
                     all_children = [[duplicate_node(grandchild) for grandchild in child.children] if len(child.children) > 1 else [duplicate_node(child)] for child in node.children]
 
+                    if budget is not None:
+                        count = 1
+                        for group in all_children:
+                            count *= len(group)
+                        created += count + sum(sum(child.size for child in group) * count // len(group) for group in all_children)
+                        budget.check_clauses(count, f"the {conversion_type} distribution")
+                        budget.check_nodes(created, f"the {conversion_type} distribution")
                     distributed_children = list(itertools.product(*all_children))
                     node.name = op_list[1]
                     node.children = []
                     for children in distributed_children:
-                        print(f"\tDistributed {op_list[0]} over {op_list[1]} and obtained:")
+                        if budget is not None:
+                            budget.check_time(f"the {conversion_type} distribution")
+                        trace.step(lambda: f"\tDistributed {op_list[0]} over {op_list[1]} and obtained:")
                         n = Node(op_list[0], children=[duplicate_node(child) for child in children])
-                        print_tree(n,2)
+                        trace.tree(n, 2)
                         s_n = simplify_tree(duplicate_node(n))
-                        if get_node_expression(s_n) == get_node_expression(n):
-                            print("\tWhich requires no further simplification.")
-                        else:
-                            print(f"\tWhich simplifies into:")
-                            print_tree(s_n,2)
+                        if trace.enabled(STEP):
+                            if get_node_expression(s_n) == get_node_expression(n):
+                                trace.step("\tWhich requires no further simplification.")
+                            else:
+                                trace.step("\tWhich simplifies into:")
+                                trace.tree(s_n, 2)
                         s_n.parent = node
-                        print(f"\tThen append it to the simplified parent: {node.name}")
-                        print_tree(simplify_tree(duplicate_node(node)), 2)
+                        if trace.enabled(FULL):
+                            trace.full(f"\tThen append it to the simplified parent: {node.name}")
+                            trace.tree(simplify_tree(duplicate_node(node)), 2)
 
             for child in node.children[:]:
                 convert(child)
             return node
 
-        conv_node = simplify_tree(convert(duplicate_node(node)))
+        try:
+            if trace.enabled(STEP):
+                conv_node = simplify_tree(convert(duplicate_node(node)))
+            else:
+                clauses = distribute_clauses(node_to_formula(node), op_list, budget, f"the {conversion_type} distribution")
+                conv_node = clause_set_to_tree(clauses, op_list)
+        except ResourceExhausted as e:
+            trace.summary(lambda: f"Stopped converting to {conversion_type}. {e}")
+            raise
+
+        if trace.enabled(SUMMARY):
+            if get_node_expression(conv_node) == get_node_expression(node):
+                trace.summary("No changes needed.")
+                trace.summary(lambda: f"The formula remains: {get_node_expression(conv_node)}")
+            else:
+                trace.summary(lambda: f"This is the {conversion_type} tree formula of the initial proposition:")
+                trace.tree(conv_node, 1, FULL)
+                trace.summary(lambda: f"With the formula: {get_node_expression(conv_node)}")
 
-        if get_node_expression(conv_node) == get_node_expression(node):
-            print("No changes needed.")
-            print(f"The formula remains: {get_node_expression(conv_node)}")
+        return conv_node
+    elif conversion_type in ["min_dnf", "min_cnf"]:
+        formula = node_to_formula(node)
+        variables = sorted(formula.variables)
+        try:
+            with profiler.stage("minimize"):
+                if len(variables) <= EXACT_VARIABLES:
+                    trace.summary(lambda: f"Minimising the {conversion_type[4:]} with the Quine-McCluskey method over {len(variables)} variables.")
+                    mask = get_valid_rows_mask(variables)
+                    column = get_truth_columns(node, variables)[get_node_expression(node)]
+                    cubes = quine_mccluskey(mask & (column if conversion_type == "min_dnf" else ~column), len(variables), budget)
+                else:
+                    trace.summary(lambda: f"Minimising the {conversion_type[4:]} heuristically; {len(variables)} variables are too many for an exact cover.")
+                    on = get_nnf_formula(formula if conversion_type == "min_dnf" else Formula("¬", [formula]))
+                    cubes = espresso(clauses_to_cubes(distribute_clauses(on, ("∧", "∨"), budget, f"the {conversion_type} distribution"), variables), budget)
+        except ResourceExhausted as e:
+            trace.summary(lambda: f"Stopped minimising the {conversion_type[4:]}. {e}")
+            raise
+        clauses = [cube_to_literals(cube, variables) for cube in cubes]
+        if conversion_type == "min_cnf":
+            clauses = [frozenset(negate_literal(literal) for literal in clause) for clause in clauses]
+            conv_node = clause_set_to_tree(clauses, ("∨", "∧"))
         else:
-            print(f"This is the {conversion_type} tree formula of the initial proposition:")
-            print_tree(conv_node, 1)
-            print(f"With the formula: {get_node_expression(conv_node)}")
+            conv_node = clause_set_to_tree(clauses, ("∧", "∨"))
+        if trace.enabled(SUMMARY):
+            trace.summary(lambda: f"This is the minimal {conversion_type[4:]} tree formula of the initial proposition, with {len(clauses)} "
+                                  f"{'clauses' if conversion_type == 'min_cnf' else 'terms'}:")
+            trace.tree(conv_node, 1, FULL)
+            trace.summary(lambda: f"With the formula: {get_node_expression(conv_node)}")
+
+        return conv_node
+    elif conversion_type == "tseitin":
+        trace.summary("Converting the tree formula to an equisatisfiable cnf using Tseitin's encoding.")
+        clauses, definitions = tseitin_clauses(node)
+        for variable, expression in definitions:
+            trace.step(lambda: f"\tIntroduced the variable {variable} for the subformula {expression}.")
+        conv_node = clauses_to_tree(clauses)
+        if trace.enabled(SUMMARY):
+            trace.summary("This is the tseitin cnf tree formula of the initial proposition:")
+            trace.tree(conv_node, 1, FULL)
+            trace.summary(lambda: f"With the formula: {get_node_expression(conv_node)}")
 
         return conv_node
     else:
-        print("Please input a correct conversion type")
+        raise ValueError(f"Unknown conversion type {conversion_type}. Please input a correct conversion type.")
+
+
+def get_fresh_variables(used, prefix="Z"):
+    index = 1
+    while True:
+        name = f"{prefix}{index}"
+        if name not in used:
+            yield name
+        index += 1
+
+
+def tseitin_clauses(node, used=(), prefix="Z"):
+    formula = node_to_formula(node)
+    fresh = get_fresh_variables(formula.variables | set(used), prefix)
+    literals = {}
+    clauses = []
+    definitions = []
+    expressions = {}
+
+    def add_clause(*clause):
+        clause = tuple(dict.fromkeys(clause))
+        if not any(negate_literal(literal) in clause for literal in clause):
+            clauses.append(clause)
+
+    for f in get_unique_subformulas(formula):
+        if f.name in ["⊤", "⊥"]:
+            if "⊤" not in literals:
+                literals["⊤"] = next(fresh)
+                definitions.append((literals["⊤"], "⊤"))
+                add_clause(literals["⊤"])
+            literals["⊥"] = negate_literal(literals["⊤"])
+            continue
+        if f.is_leaf:
+            literals[f] = f.name
+            continue
+        operands = [literals[child.name] if child.name in ["⊤", "⊥"] else literals[child] for child in f.children]
+        if f.name == "¬":
+            literals[f] = negate_literal(operands[0])
+            continue
+
+        x = literals[f] = next(fresh)
+        definitions.append((x, get_formula_expression(f, expressions)))
+        if f.name == "∧":
+            for operand in operands:
+                add_clause(negate_literal(x), operand)
+            add_clause(x, *(negate_literal(operand) for operand in operands))
+        elif f.name == "∨":
+            add_clause(negate_literal(x), *operands)
+            for operand in operands:
+                add_clause(x, negate_literal(operand))
+        elif f.name == "⇒":
+            left, right = operands
+            add_clause(negate_literal(x), negate_literal(left), right)
+            add_clause(x, left)
+            add_clause(x, negate_literal(right))
+        elif f.name == "⇔":
+            left, right = operands
+            add_clause(negate_literal(x), negate_literal(left), right)
+            add_clause(negate_literal(x), left, negate_literal(right))
+            add_clause(x, left, right)
+            add_clause(x, negate_literal(left), negate_literal(right))
+        else:
+            raise Exception(f"Unknown connective {f.name}.")
+
+    root = literals[formula.name] if formula.name in ["⊤", "⊥"] else literals[formula]
+    add_clause(root)
+    counters["clauses"] += len(clauses)
+    return clauses, definitions
+
+
+def clauses_to_tree(clauses, op_list=("∨", "∧")):
+    def literal_node(literal):
+        return Node("¬", children=[Node(literal[1:])]) if literal[0] == "¬" else Node(literal)
+
+    return Node(op_list[1], children=[Node(op_list[0], children=[literal_node(literal) for literal in clause])
+                                      if len(clause) > 1 else literal_node(clause[0]) for clause in clauses])
+
+
+def get_literal_key(literal):
+    return literal.lstrip("¬"), literal
+
+
+def negate_literal(literal):
+    return literal[1:] if literal[0] == "¬" else f"¬{literal}"
+
+
+def remove_subsumed(clauses):
+    if frozenset() in clauses:
+        return {frozenset(): None}
+    kept = set()
+    index = {}
+    for clause in sorted(clauses, key=len):
+        if not any(other <= clause for literal in clause for other in index.get(literal, ())):
+            kept.add(clause)
+            index.setdefault(min(clause), []).append(clause)
+    return {clause: None for clause in clauses if clause in kept}
+
+
+def distribute_clauses(formula, op_list=("∨", "∧"), budget=None, stage="the cnf distribution"):
+    absorbing = "⊤" if op_list[0] == "∨" else "⊥"
+    clause_sets = {}
+    created = 0
+
+    def multiply(left, right):
+        nonlocal created
+        if budget is not None:
+            budget.check_clauses(len(left) * len(right), stage)
+        product = {}
+        for first in left:
+            for second in right:
+                if not any(negate_literal(literal) in second for literal in first):
+                    clause = first | second
+                    if clause not in product:
+                        product[clause] = None
+                        created += len(clause)
+            if budget is not None:
+                budget.check_nodes(created, stage)
+        return remove_subsumed(product)
+
+    def convert(f):
+        if f in clause_sets:
+            return clause_sets[f]
+        if f.is_leaf:
+            if f.name == absorbing:
+                clauses = {}
+            elif f.name in ["⊤", "⊥"]:
+                clauses = {frozenset(): None}
+            else:
+                clauses = {frozenset([f.name]): None}
+        elif f.name == "¬":
+            child = f.children[0]
+            if child.name in ["⊤", "⊥"]:
+                clauses = {} if child.name != absorbing else {frozenset(): None}
+            else:
+                clauses = {frozenset([f"¬{child.name}"]): None}
+        elif f.name == op_list[1]:
+            clauses = {}
+            for child in f.children:
+                clauses.update(convert(child))
+            clauses = remove_subsumed(clauses)
+        elif f.name == op_list[0]:
+            clauses = {frozenset(): None}
+            for child in f.children:
+                clauses = multiply(clauses, convert(child))
+        else:
+            raise Exception(f"Expected a formula in nnf, found the connective {f.name}.")
+        clause_sets[f] = clauses
+        return clauses
+
+    clauses = convert(formula)
+    counters["clauses"] += len(clauses)
+    return list(clauses)
+
+
+def iter_distributed_clauses(formula, op_list=("∨", "∧"), budget=None, stage="the cnf distribution", subsumption=True):
+    absorbing = "⊤" if op_list[0] == "∨" else "⊥"
+    index = {}
+
+    def subsumed(clause):
+        return any(other <= clause for literal in clause for other in index.get(literal, ()))
+
+    def stream(f, context):
+        if f.is_leaf or f.name == "¬":
+            name = f.name if f.is_leaf else f.children[0].name
+            if name in ["⊤", "⊥"]:
+                if (name == absorbing) != f.is_leaf:
+                    yield frozenset()
+            else:
+                yield frozenset([name if f.is_leaf else f"¬{name}"])
+        elif f.name == op_list[1]:
+            for child in f.children:
+                yield from stream(child, context)
+        elif f.name == op_list[0]:
+            yield from multiply(f.children, context)
+        else:
+            raise Exception(f"Expected a formula in nnf, found the connective {f.name}.")
+
+    def multiply(children, context):
+        if not children:
+            yield frozenset()
+            return
+        pending = [(stream(children[0], context), frozenset())]
+        while pending:
+            clauses, partial = pending[-1]
+            clause = next(clauses, None)
+            if clause is None:
+                pending.pop()
+                continue
+            if budget is not None:
+                budget.check_time(stage)
+            if any(negate_literal(literal) in partial or negate_literal(literal) in context for literal in clause):
+                continue
+            extended = partial | clause
+            if subsumption and subsumed(context | extended):
+                continue
+            if len(pending) == len(children):
+                yield extended
+            else:
+                pending.append((stream(children[len(pending)], context | extended), extended))
+
+    count = 0
+    for clause in stream(formula, frozenset()):
+        if subsumption:
+            if subsumed(clause):
+                continue
+            if clause:
+                index.setdefault(min(clause), []).append(clause)
+        count += 1
+        counters["clauses"] += 1
+        if budget is not None:
+            budget.check_clauses(count, stage)
+        yield clause
+        if subsumption and not clause:
+            return
+
+
+def clause_set_to_tree(clauses, op_list=("∨", "∧")):
+    if not clauses:
+        return Node("⊤" if op_list[0] == "∨" else "⊥")
+    if clauses == [frozenset()]:
+        return Node("⊥" if op_list[0] == "∨" else "⊤")
+    ordered = [sorted(clause, key=get_literal_key) for clause in clauses]
+    node = clauses_to_tree(ordered, op_list)
+    return node.children[0] if len(node.children) == 1 else node
 
 
 def simplify_tree(node):
@@ -1,5 +1,14 @@
+import heapq
 import re
-from normal_form import transform_to_normal_form
+import time
+from bdd import check_validity_bdd
+from budget import ResourceExhausted, get_budget
+from cdcl import CDCLSolver
+from instrumentation import counters, record_stats, profiler
+from formula import node_to_formula
+from normal_form import transform_to_normal_form, tseitin_clauses, iter_distributed_clauses, get_literal_key
+from results import SatResult, InterpretationResult, ValidityResult
+from tracing import get_tracer, SILENT, SUMMARY, STEP
 from utility import *
 from wff import relaxed_to_strong
 
@@ -19,248 +28,643 @@ def clausal_to_strong(inp, tree=True):
         if clause == {''}:
             clauses[i] = {"⊥"}
 
+    clauses = [sorted(clause, key=get_literal_key) for clause in clauses]
     if tree:
-        return Node("∧", children=[( Node("¬", children=[Node(sorted(clause)[0][1:])])
-                                     if sorted(clause)[0][0] == "¬" else Node(sorted(clause)[0]) )
+        return Node("∧", children=[( Node("¬", children=[Node(clause[0][1:])])
+                                     if clause[0][0] == "¬" else Node(clause[0]) )
                                    if len(clause) == 1 else Node("∨", children=[Node(literal[0], children=[Node(literal[1:])])
                                 if literal[0] == "¬" else Node(literal) for literal in clause]) for clause in clauses])
     else:
         return " ∧ ".join([f"({' ∨ '.join(clause)})" if len(clause) > 1 else f"{' ∨ '.join(clause)}" for clause in clauses])
 
 
-def strong_to_clausal(inp):
+def strong_to_clausal(inp, tseitin=False):
     if type(inp) == str:
         node = relaxed_to_strong(inp)
     elif type(inp) == Node:
         node = inp
     else:
         return
-    node = transform_to_normal_form(node, "cnf")
+    return get_printed_clauses(tree_to_clauses(transform_to_normal_form(node, "tseitin" if tseitin else "cnf")))
+
+
+def tree_to_clauses(node):
+    if node.name == "⊤":
+        return []
+    clauses = []
+    for clause in node.children if node.name == "∧" else [node]:
+        literals = set()
+        for literal in clause.children if clause.name == "∨" else [clause]:
+            if literal.name == "⊤" or literal.name == "¬" and literal.children[0].name == "⊥":
+                break
+            elif literal.name == "¬" and literal.children[0].name != "⊤":
+                literals.add(f"¬{literal.children[0].name}")
+            elif literal.name not in ["⊥", "¬"]:
+                literals.add(literal.name)
+        else:
+            clauses.append(literals)
+    counters["clauses"] += len(clauses)
+    return clauses
 
-    return f"{{{", ".join(f"{{{", ".join(get_node_expression(grandchild) for grandchild in child.children)}}}" 
-                          if len(child.children) > 1 else f"{{{get_node_expression(child)}}}" for child in node.children)}}}".replace("(", "").replace(")", "")
+
+def encode_clauses(clauses, variables=None, index=None):
+    if variables is None:
+        variables = []
+    if index is None:
+        index = {name: i + 1 for i, name in enumerate(variables)}
+    int_clauses = []
+    for clause in clauses:
+        int_clause = set()
+        for literal in clause:
+            if type(literal) == int:
+                int_clause.add(literal)
+                continue
+            if not literal:
+                continue
+            name = literal[1:] if literal[0] == "¬" else literal
+            if name not in index:
+                variables.append(name)
+                index[name] = len(variables)
+            int_clause.add(-index[name] if literal[0] == "¬" else index[name])
+        int_clauses.append(int_clause)
+    return int_clauses, variables
+
+
+def decode_literal(literal, variables):
+    return f"¬{variables[-literal - 1]}" if literal < 0 else variables[literal - 1]
+
+
+def node_to_int_clauses(node, tseitin=False, variables=None, trace=None, budget=None):
+    with profiler.stage("tseitin" if tseitin else "cnf"):
+        tree = transform_to_normal_form(node, "tseitin" if tseitin else "cnf", trace, budget)
+    with profiler.stage("clauses"):
+        return encode_clauses(tree_to_clauses(tree), variables)
+
+
+def iter_int_clauses(node, variables, trace=None, budget=None):
+    budget = get_budget(budget)
+    node = transform_to_normal_form(node, "nnf", trace, budget)
+    index = {name: i + 1 for i, name in enumerate(variables)}
+    for clause in iter_distributed_clauses(node_to_formula(node), budget=budget, stage="the streamed cnf distribution"):
+        int_clause = set()
+        for literal in clause:
+            name = literal[1:] if literal[0] == "¬" else literal
+            if name not in index:
+                variables.append(name)
+                index[name] = len(variables)
+            int_clause.add(-index[name] if literal[0] == "¬" else index[name])
+        yield int_clause
+
+
+def write_dimacs(clauses, path, variables=None):
+    highest = 0
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(" " * 48 + "\n")
+        for clause in clauses:
+            literals = sorted(clause, key=abs)
+            highest = max([highest] + [abs(literal) for literal in literals])
+            file.write(" ".join(map(str, literals + [0])) + "\n")
+            count += 1
+        if variables is not None:
+            highest = max(highest, len(variables))
+        file.seek(0)
+        file.write(f"p cnf {highest} {count}".ljust(48))
+    return highest, count
+
+
+def node_to_dimacs(node, path, trace=None, budget=None):
+    variables = []
+    write_dimacs(iter_int_clauses(node, variables, trace, budget), path, variables)
+    return variables
+
+
+def as_int_clauses(clauses, variables=None):
+    if all(type(literal) == int for clause in clauses for literal in clause):
+        if variables is None:
+            variables = [str(i + 1) for i in range(max((abs(literal) for clause in clauses for literal in clause), default=0))]
+        return [set(clause) for clause in clauses], variables
+    return encode_clauses(clauses, variables)
 
 
 def negate_literal(literal):
+    if type(literal) == int:
+        return -literal
     if literal:
         return literal[1:] if literal[0] == "¬" else f"¬{literal}"
 
 
-def create_clause_list(inp):
+def create_clause_list(inp, tseitin=False):
     if type(inp) == Node:
-        string = strong_to_clausal(inp)
+        return tree_to_clauses(transform_to_normal_form(inp, "tseitin" if tseitin else "cnf"))
     elif type(inp) == str:
-        if "{" in inp:
-            string = inp
-        else:
-            string = strong_to_clausal(inp)
+        if "{" not in inp:
+            return tree_to_clauses(transform_to_normal_form(relaxed_to_strong(inp), "tseitin" if tseitin else "cnf"))
+        string = inp
     else:
         raise Exception("Input should be string or node.")
     return [] if string == "{}" else [{literal for literal in clause.strip("{}").split(",")} for clause in re.findall(r"{[^{}]*}", string.replace(" ", ""))]
 
 
-def get_printed_clauses(clauses):
-    return "{" + ", ".join(f"{{{', '.join(clause)}}}" for clause in clauses) + "}"
+def get_printed_clause(clause, variables=None):
+    if variables is None:
+        return f"{{{', '.join(sorted(clause, key=get_literal_key))}}}"
+    return f"{{{', '.join(decode_literal(literal, variables) for literal in sorted(clause, key=abs))}}}"
+
+
+def get_printed_clauses(clauses, variables=None):
+    return "{" + ", ".join(get_printed_clause(clause, variables) for clause in clauses) + "}"
+
 
+def is_tautology(clause):
+    return any(-literal in clause for literal in clause)
 
-def resolve(clause1, clause2):
-    for literal in clause1:
-        negation = negate_literal(literal)
-        if negation in clause2:
-            resolvent = (clause1 - {literal}) | (clause2 - {negation})
-            return resolvent
+
+def find_subsuming_clause(clause, occurrences):
+    for literal in clause:
+        for other in occurrences.get(literal, ()):
+            if len(other) <= len(clause) and other <= clause:
+                return other
     return None
 
 
-def resolution(clauses, dp=True, explicit_print=False):
+def find_subsumed_clauses(clause, occurrences):
+    candidates = None
+    for literal in sorted(clause, key=lambda lit: len(occurrences.get(lit, ()))):
+        candidates = set(occurrences.get(literal, ())) if candidates is None else candidates & occurrences.get(literal, set())
+        if not candidates:
+            return set()
+    return candidates
+
+
+def saturate(clauses, dp, explicit_print, variables, trace, budget=None, stats=None):
+    if stats is None:
+        stats = {"resolvents": 0, "subsumed": 0, "clauses": 0}
+    stepping = trace.enabled(STEP)
+    active = set()
+    occurrences = {}
+    queue = []
+    seen = set()
+    for clause in map(frozenset, clauses):
+        if is_tautology(clause):
+            trace.step(lambda: f"\tSkipping clause {get_printed_clause(clause, variables)} as it contains a literal and its negation, being equivalent to a tautology.")
+        elif clause not in seen:
+            seen.add(clause)
+            heapq.heappush(queue, (len(clause), len(seen), clause))
+    stats["clauses"] = max(stats["clauses"], len(seen))
+
+    while queue:
+        given = heapq.heappop(queue)[2]
+        subsuming = find_subsuming_clause(given, occurrences)
+        if subsuming is not None:
+            trace.step(lambda: f"\tClause {get_printed_clause(given, variables)} is subsumed by {get_printed_clause(subsuming, variables)}.") if explicit_print else None
+            stats["subsumed"] += 1
+            continue
+        for other in find_subsumed_clauses(given, occurrences):
+            stats["subsumed"] += 1
+            trace.step(lambda: f"\tClause {get_printed_clause(other, variables)} is subsumed by {get_printed_clause(given, variables)}.") if explicit_print else None
+            active.remove(other)
+            for literal in other:
+                occurrences[literal].remove(other)
+
+        for literal in given:
+            for other in occurrences.get(-literal, ()):
+                resolvent = (given - {literal}) | (other - {-literal})
+                stats["resolvents"] += 1
+                tautology = is_tautology(resolvent)
+                if not stepping:
+                    pass
+                elif explicit_print:
+                    trace.step(f"\tFrom clauses {get_printed_clause(given, variables)} and {get_printed_clause(other, variables)} we obtained the resolvent: "
+                               f"{get_printed_clause(resolvent, variables)}{", which is already in the set of clauses" if resolvent in seen else ""}.")
+                    if tautology:
+                        trace.step(f"\tSkipping resolvent {get_printed_clause(resolvent, variables)} as it contains a literal and its negation, being equivalent to a tautology.")
+                elif resolvent not in seen and not tautology:
+                    trace.step(f"\tFrom clauses {get_printed_clause(given, variables)} and {get_printed_clause(other, variables)} we obtained the resolvent: "
+                               f"{get_printed_clause(resolvent, variables)}.")
+                if budget is not None:
+                    budget.add_resolvent("resolution")
+                if tautology or resolvent in seen:
+                    continue
+                if not resolvent:
+                    trace.summary("Clause {} resulted as a resolvent, therefore the proposition is unsatisfiable.")
+                    return False
+                seen.add(resolvent)
+                stats["clauses"] = max(stats["clauses"], len(seen))
+                if budget is not None:
+                    budget.check_clauses(len(seen), "resolution")
+                if dp and len(resolvent) == 1:
+                    return [set(clause) for clause in active] + [set(given)] + [set(entry[2]) for entry in queue] + [set(resolvent)]
+                heapq.heappush(queue, (len(resolvent), len(seen), resolvent))
+
+        active.add(given)
+        for literal in given:
+            occurrences.setdefault(literal, set()).add(given)
+
+    trace.summary("No new clauses created, therefore the proposition is satisfiable.")
+    return True
+
+
+def resolution(clauses, dp=True, explicit_print=False, variables=None, trace=None, budget=None):
+    trace = get_tracer(trace)
+    budget = get_budget(budget)
+    started = time.perf_counter()
+    stats = {"resolvents": 0, "subsumed": 0, "clauses": 0, "simplifications": 0}
+    clauses, variables = as_int_clauses(clauses, variables)
     if not clauses:
-        print("Received the empty set of clauses as an input. The proposition becomes a tautology, being always satisfiable.")
-        return True
-    elif {""} in clauses:
-        print("Received a set of clauses that contains an empty set. The proposition becomes a contradiction, being always unsatisfiable.")
-        return False
-    print(f"Calculating the resolvents for the clauses: {get_printed_clauses(clauses)}.")
+        trace.summary("Received the empty set of clauses as an input. The proposition becomes a tautology, being always satisfiable.")
+        satisfiable = True
+    elif set() in clauses:
+        trace.summary("Received a set of clauses that contains an empty set. The proposition becomes a contradiction, being always unsatisfiable.")
+        satisfiable = False
+    else:
+        trace.summary(lambda: f"Calculating the resolvents for the clauses: {get_printed_clauses(clauses, variables)}.")
+        try:
+            satisfiable = saturate_with_simplification(clauses, dp, explicit_print, variables, trace, budget, stats)
+        except ResourceExhausted as e:
+            trace.summary(lambda: f"Stopped the resolution. {e}")
+            raise
+        finally:
+            record_stats(stats)
+    return SatResult(satisfiable, None, "resolution dp" if dp else "resolution", stats, time.perf_counter() - started)
+
+
+def saturate_with_simplification(clauses, dp, explicit_print, variables, trace, budget, stats):
     while True:
-        new = set()
         if dp:
-            print("\tSimplify the clauses using Davis Putnam's method.")
-            clauses = one_literal_elimination(clauses)
+            stats["simplifications"] += 1
+            trace.step("\tSimplify the clauses using Davis Putnam's method.")
+            clauses = one_literal_elimination(clauses, variables, trace)
             if set() in clauses:
-                print("Clause {} resulted from simplification, therefore the proposition is unsatisfiable.")
+                trace.summary("Clause {} resulted from simplification, therefore the proposition is unsatisfiable.")
                 return False
             elif not clauses:
-                print("After the simplification the set of clauses is {}, therefore the proposition is satisfiable.")
+                trace.summary("After the simplification the set of clauses is {}, therefore the proposition is satisfiable.")
                 return True
-            clauses = pure_literal_elimination(clauses)
+            clauses = pure_literal_elimination(clauses, variables, trace)
             if set() in clauses:
-                print("Clause {} resulted from simplification, therefore the proposition is unsatisfiable.")
+                trace.summary("Clause {} resulted from simplification, therefore the proposition is unsatisfiable.")
                 return False
             elif not clauses:
-                print("After the simplification the set of clauses is {}, therefore the proposition is satisfiable.")
+                trace.summary("After the simplification the set of clauses is {}, therefore the proposition is satisfiable.")
                 return True
-        pairs = [(clauses[i], clauses[j]) for i in range(len(clauses)) for j in range(i + 1, len(clauses))]
-        for clause1, clause2 in pairs:
-            resolvent = resolve(clause1, clause2)
-            if resolvent is not None:
-                if explicit_print:
-                    print(f"\tFrom clauses {clause1} and {clause2} we obtained the resolvent: {f'{resolvent}' if resolvent else '{}'}"
-                          f"{f", which is already in the set of clauses" if resolvent in clauses else ""}.")
-                    if any(negate_literal(lit) in resolvent for lit in resolvent):
-                        print(f"\tSkipping resolvent {resolvent} as it contains a literal and its negation, being equivalent to a tautology.")
-                        continue
-                else:
-                    print(f"\tFrom clauses {clause1} and {clause2} we obtained the resolvent: {f'{resolvent}' if resolvent else '{}'}.") if resolvent not in clauses else None
-                if not resolvent or resolvent == set():
-                    print("Clause {} resulted as a resolvent, therefore the proposition is unsatisfiable.")
-                    return False
-                new.add(frozenset(resolvent)) if frozenset(resolvent) not in new else None
-                if dp and len(resolvent) == 1:
-                    all_clauses = clauses + list(map(set, new))
-                    all_clauses = one_literal_elimination(all_clauses)
-                    if set() in all_clauses:
-                        print("Clause {} resulted from simplification, therefore the proposition is unsatisfiable.")
-                        return False
-                    return resolution(all_clauses)
-
-        if new.issubset(set(map(frozenset, clauses))):
-            print("No new clauses created, therefore the proposition is satisfiable.")
-            return True
-        clauses.extend(list(map(set, new)))
+        result = saturate(clauses, dp, explicit_print, variables, trace, budget, stats)
+        if type(result) == bool:
+            return result
+        trace.step("A clause with one literal resulted as a resolvent. Simplifying the clauses again:")
+        clauses = result
 
 
-def one_literal_elimination(clauses):
-    print("\tChecking for clause sets with one literal:")
+def one_literal_elimination(clauses, variables=None, trace=None):
+    trace = get_tracer(trace)
+    trace.step("\tChecking for clause sets with one literal:")
     applied = False
-    for clause in clauses[:]:
-        if len(clause) == 1:
-            applied = True
-            print(f"\tFound a clause with only one literal: {clause}")
-            literal = next(iter(clause))
-            negation = negate_literal(literal)
-            for c in clauses[:]:
-                if literal in c:
-                    print(f"\tEliminate clause {c}; it contains {literal}.")
-                    clauses.remove(c)
-                if negation in c:
-                    print(f"\tEliminate the negation of the literal {literal} from the clause {c}.")
-                    c.remove(negation)
-                if set() in clauses:
-                    return clauses
-    if any(len(clause) == 1 for clause in clauses):
-        print(f"The clauses set is: {get_printed_clauses(clauses)}")
-        print("A set with one literal resulted from the simplification. Simplifying again:")
-        return one_literal_elimination(clauses)
-    print(f"\tThe set of clauses becomes: {get_printed_clauses(clauses)}") if applied else print("\tFound none, the set of clauses remains the same.")
+    while any(len(clause) == 1 for clause in clauses):
+        if applied:
+            trace.full(lambda: f"The clauses set is: {get_printed_clauses(clauses, variables)}")
+            trace.step("A set with one literal resulted from the simplification. Simplifying again:")
+        applied = True
+        units = set()
+        for clause in clauses:
+            if len(clause) == 1:
+                literal = next(iter(clause))
+                if literal not in units and negate_literal(literal) not in units:
+                    trace.step(lambda: f"\tFound a clause with only one literal: {get_printed_clause(clause, variables)}")
+                    units.add(literal)
+        negations = {negate_literal(literal) for literal in units}
+        kept = []
+        for clause in clauses:
+            if clause & units:
+                trace.step(lambda: f"\tEliminate clause {get_printed_clause(clause, variables)}; it contains {get_printed_clause(clause & units, variables)[1:-1]}.")
+                continue
+            if clause & negations:
+                trace.step(lambda: f"\tEliminate the negation of the literal {get_printed_clause({negate_literal(literal) for literal in clause & negations}, variables)[1:-1]} "
+                                   f"from the clause {get_printed_clause(clause, variables)}.")
+                clause -= negations
+            kept.append(clause)
+            if not clause:
+                return kept
+        clauses = kept
+    trace.full(lambda: f"\tThe set of clauses becomes: {get_printed_clauses(clauses, variables)}") if applied else trace.step("\tFound none, the set of clauses remains the same.")
 
     return clauses
 
 
-def pure_literal_elimination(clauses):
+def pure_literal_elimination(clauses, variables=None, trace=None):
+    trace = get_tracer(trace)
     all_literals = {lit for clause in clauses for lit in clause}
     pure_literals = {lit for lit in all_literals if negate_literal(lit) not in all_literals}
 
-    print(f"\tIdentified pure literals: {pure_literals}.\n\tFor each, eliminate the sets containing it.") \
-        if pure_literals else print("\tThere are no pure literals in the clauses set.\n\tIt remains unchanged.")
+    trace.step(lambda: f"\tIdentified pure literals: {get_printed_clause(pure_literals, variables)}.\n\tFor each, eliminate the sets containing it.") \
+        if pure_literals else trace.step("\tThere are no pure literals in the clauses set.\n\tIt remains unchanged.")
 
     if pure_literals:
         for clause in clauses[:]:
             if clause & pure_literals:
-                print(f"\tEliminated clause: {clause}.")
+                trace.step(lambda: f"\tEliminated clause: {get_printed_clause(clause, variables)}.")
                 clauses.remove(clause)
 
     return clauses
 
 
-def find_satisfying_interpretation(clauses):
-    if not clauses:
-        return "Any interpretation is a satisfying truth valuation."
-    elif {""} in clauses:
-        return "Unsatisfiable proposition has no satisfying truth valuation."
-
-    positive_literals = [lit for clause in clauses for lit in clause if lit[0] != "¬"]
-
-    def adapted_dpll(clauses, assignment):
-        clauses = [clause for clause in clauses if not any(lit in assignment and assignment[lit] for lit in clause)]
-
-        if any(len(clause) == 0 for clause in clauses):
+def solve_with_cdcl(clauses, variables, trace=None, budget=None):
+    trace = get_tracer(trace)
+    trace.summary(lambda: f"Calculating satisfiability with the CDCL solver for the clauses: {get_printed_clauses(clauses, variables)}.")
+    solver = CDCLSolver(clauses, len(variables))
+    result = solver.solve(budget=budget)
+    trace.summary(lambda: f"\tThe solver made {solver.stats['decisions']} decisions, {solver.stats['propagations']} propagations and "
+                          f"{solver.stats['conflicts']} conflicts, learning {solver.stats['learned']} clauses.")
+    trace.summary("The formula is satisfiable.") if result else trace.summary("The formula is unsatisfiable.")
+    model = {variables[variable - 1]: value for variable, value in solver.model.items()} if result else None
+    record_stats(solver.stats)
+    return SatResult(result, model, "cdcl", dict(solver.stats))
+
+
+def solve_clause_stream(clauses, variables, trace=None, budget=None):
+    trace = get_tracer(trace)
+    budget = get_budget(budget)
+    started = time.perf_counter()
+    solver = CDCLSolver()
+    count = 0
+    try:
+        for clause in clauses:
+            count += 1
+            if not solver.add_clause(clause):
+                trace.summary(lambda: f"\tThe streamed clause {get_printed_clause(clause, variables)} is contradicted by the previous ones; "
+                                      f"the rest of the stream is skipped.")
+                break
+        trace.summary(lambda: f"Calculating satisfiability with the CDCL solver for {count} streamed clauses.")
+        result = solver.solve(budget=budget)
+    except ResourceExhausted as e:
+        trace.summary(lambda: f"Stopped the satisfiability check. {e}")
+        raise
+    trace.summary("The formula is satisfiable.") if result else trace.summary("The formula is unsatisfiable.")
+    model = {variables[variable - 1]: value for variable, value in solver.model.items()} if result else None
+    record_stats(solver.stats)
+    return SatResult(result, model, "cdcl stream", dict(solver.stats, clauses=count), time.perf_counter() - started)
+
+
+class SatSession:
+    def __init__(self, tseitin=False, trace=None):
+        self.solver = CDCLSolver()
+        self.variables = []
+        self.index = {}
+        self.user_variables = set()
+        self.selectors = 0
+        self.tseitin = tseitin
+        self.trace = get_tracer(trace)
+        self.queries = 0
+
+
+    def encode(self, clauses):
+        clauses, self.variables = encode_clauses(clauses, self.variables, self.index)
+        self.solver.ensure_variables(len(self.variables))
+        return clauses
+
+
+    def literal(self, literal):
+        if type(literal) == int:
+            return literal
+        self.user_variables.add(literal.lstrip("¬"))
+        return self.encode([[literal]])[0].pop()
+
+
+    def add_clauses(self, clauses):
+        clauses = [list(clause) for clause in clauses]
+        self.user_variables.update(literal.lstrip("¬") for clause in clauses for literal in clause if type(literal) == str and literal)
+        return self.solver.add_clauses(self.encode(clauses))
+
+
+    def formula_clauses(self, node):
+        self.user_variables |= get_variables(node) - {"⊤", "⊥"}
+        if self.tseitin:
+            return self.encode(tseitin_clauses(node, self.variables, "z")[0])
+        return self.encode(tree_to_clauses(transform_to_normal_form(node, "cnf", self.trace)))
+
+
+    def add_formula(self, node):
+        return self.solver.add_clauses(self.formula_clauses(node))
+
+
+    def new_selector(self):
+        self.selectors += 1
+        while f"s{self.selectors}" in self.index:
+            self.selectors += 1
+        return self.encode([[f"s{self.selectors}"]])[0].pop()
+
+
+    def solve(self, assumptions=()):
+        return self.solver.solve([self.literal(literal) for literal in assumptions])
+
+
+    def get_model(self):
+        if self.solver.model is None:
             return None
-
-        if not clauses:
-            return {lit if not lit.startswith("¬") else lit[1:]: not lit.startswith("¬") for lit in assignment}
-
-        unassigned = sorted({lit for clause in clauses for lit in clause if lit not in assignment and negate_literal(lit) not in assignment})
-        if not unassigned:
+        return {name: self.solver.model[i + 1] for i, name in enumerate(self.variables) if name in self.user_variables}
+
+
+    def entails(self, node):
+        selector = self.new_selector()
+        clauses = self.formula_clauses(Node("¬", children=[duplicate_node(node)]))
+        self.solver.add_clauses([clause | {-selector} for clause in clauses])
+        satisfiable = self.solve([selector])
+        self.solver.add_clause([-selector])
+        self.queries += 1
+        self.trace.step(lambda: f"\tQuery {self.queries} of this session: {self.solver.stats['conflicts']} conflicts so far, "
+                                f"{len(self.solver.learned)} learned clauses kept for the next query.")
+        return not satisfiable
+
+
+def find_satisfying_interpretation(clauses, variables=None, backend="dpll", trace=None, budget=None):
+    trace = get_tracer(trace)
+    budget = get_budget(budget)
+    started = time.perf_counter()
+    clauses, variables = as_int_clauses(clauses, variables)
+    if not clauses:
+        return InterpretationResult(True, {}, backend)
+    elif set() in clauses:
+        return InterpretationResult(False, None, backend)
+
+    try:
+        result = search_interpretation(clauses, variables, backend, trace, budget)
+    except ResourceExhausted as e:
+        trace.summary(lambda: f"Stopped the search for a satisfying truth valuation. {e}")
+        raise
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def search_interpretation(clauses, variables, backend, trace, budget):
+    if backend == "cdcl":
+        result = solve_with_cdcl(clauses, variables, trace, budget)
+        interpretation, stats = result.model, result.stats
+    elif backend != "dpll":
+        raise Exception(f"Unknown satisfiability backend {backend}.")
+    else:
+        stats = {"decisions": 0, "propagations": 0, "conflicts": 0}
+        interpretation = iterative_dpll(clauses, variables, SILENT, budget, stats)
+        record_stats(stats)
+        if interpretation is not None:
+            interpretation = {variables[var - 1]: value for var, value in interpretation.items()}
+
+    if interpretation is None:
+        trace.summary("Unsatisfiable proposition has no satisfying truth valuation.")
+        return InterpretationResult(False, None, backend, stats)
+
+    occurring = {abs(lit) for clause in clauses for lit in clause}
+    return InterpretationResult(True, {variables[var - 1]: interpretation[variables[var - 1]] for var in sorted(occurring)}, backend, stats)
+
+
+def iterative_dpll(clauses, variables, trace=None, budget=None, stats=None):
+    trace = get_tracer(trace)
+    if stats is None:
+        stats = {"decisions": 0, "propagations": 0, "conflicts": 0}
+    clauses = [list(clause) for clause in clauses]
+    values = [0] * (len(variables) + 1)
+    occurrences = {literal: [] for var in range(1, len(variables) + 1) for literal in (var, -var)}
+    for index, clause in enumerate(clauses):
+        if not clause:
+            trace.summary("Encountered an empty clause. The formula is unsatisfiable.")
             return None
-
-        literal = unassigned[0]
-
-        assignment[literal] = True
-        result = adapted_dpll(clauses, assignment)
-        if result is not None:
-            return result
-
-        del assignment[literal]
-        assignment[negate_literal(literal)] = True
-        result = adapted_dpll(clauses, assignment)
-        if result is not None:
-            return result
-
-        del assignment[negate_literal(literal)]
+        for literal in clause:
+            occurrences[literal].append(index)
+    satisfied = [0] * len(clauses)
+    falsified = [0] * len(clauses)
+    trail = []
+    decisions = []
+    head = 0
+
+    def assign(literal):
+        values[abs(literal)] = 1 if literal > 0 else -1
+        trail.append(literal)
+        for index in occurrences[literal]:
+            satisfied[index] += 1
+        for index in occurrences[-literal]:
+            falsified[index] += 1
+
+    def unassign(literal):
+        values[abs(literal)] = 0
+        for index in occurrences[literal]:
+            satisfied[index] -= 1
+        for index in occurrences[-literal]:
+            falsified[index] -= 1
+
+    def propagate():
+        nonlocal head
+        while head < len(trail):
+            literal = trail[head]
+            head += 1
+            for index in occurrences[-literal]:
+                if satisfied[index]:
+                    continue
+                clause = clauses[index]
+                if falsified[index] == len(clause):
+                    return clause
+                if falsified[index] == len(clause) - 1:
+                    unit = next(lit for lit in clause if values[abs(lit)] == 0)
+                    trace.step(lambda: f"\tThe clause {get_printed_clause(clause, variables)} became a one literal clause; "
+                                       f"assign {decode_literal(unit, variables)}.")
+                    stats["propagations"] += 1
+                    assign(unit)
         return None
 
-    clauses = [frozenset(clause) for clause in clauses]
-    interpretation = adapted_dpll(clauses, {})
-
-    if not interpretation:
-        print("Unsatisfiable proposition has no satisfying truth valuation.")
-        return None
-
-    for lit in positive_literals:
-        if lit not in interpretation:
-            interpretation[lit] = False
-
-    return f"A satisfying truth valuation is: {interpretation}"
-
-
-
-def dpll(clauses):
-    print(f"Calculating satisfiability for the clauses: {get_printed_clauses(clauses)}.")
-
-    clauses = one_literal_elimination(clauses)
-    if set() in clauses:
-        print(f"The clauses set is: {get_printed_clauses(clauses)}.")
-        print("Encountered an empty clause. The formula is unsatisfiable.")
-        return False
-    if not clauses:
-        print("All clauses have been satisfied. The formula is satisfiable.")
-        return True
-
-    clauses = pure_literal_elimination(clauses)
-    if set() in clauses:
-        print("Encountered an empty clause. The formula is unsatisfiable.")
-        return False
-    if not clauses:
-        print("All clauses have been satisfied. The formula is satisfiable.")
-        return True
-
-    print("Applying the split rule.")
-    unassigned_literals = {lit for clause in clauses for lit in clause}
-    split_literal = next(iter(unassigned_literals))
-    print(f"Splitting on literal: {split_literal}")
-
-    clauses_with_literal = clauses + [{split_literal}]
-    if dpll(clauses_with_literal):
-        return True
-    clauses_with_neg_literal = clauses + [{negate_literal(split_literal)}]
-
-    return dpll(clauses_with_neg_literal)
-
+    for clause in clauses:
+        if len(clause) == 1 and values[abs(clause[0])] == 0:
+            assign(clause[0])
+        elif len(clause) == 1 and values[abs(clause[0])] != (1 if clause[0] > 0 else -1):
+            trace.summary(lambda: f"Found contradicting one literal clauses for {decode_literal(abs(clause[0]), variables)}. The formula is unsatisfiable.")
+            return None
 
-def check_validity(node):
-    print("To check if a formula is valid, we check if it's negation is unsatisfiable.")
-    negated_node = Node("¬", children=[duplicate_node(node)])
-    res = dpll(create_clause_list(negated_node))
-    if res:
-        print(f"Therefore, the formula {get_node_expression(node)} is invalid.")
+    while True:
+        if budget is not None:
+            budget.check_time("dpll")
+        conflict = propagate()
+        if conflict is not None:
+            stats["conflicts"] += 1
+            trace.step(lambda: f"\tThe clause {get_printed_clause(conflict, variables)} became empty.")
+            while decisions and decisions[-1][2]:
+                decisions.pop()
+            if not decisions:
+                trace.summary("Every split was refuted. The formula is unsatisfiable.")
+                return None
+            position, literal, _ = decisions[-1]
+            while len(trail) > position:
+                unassign(trail.pop())
+            head = position
+            decisions[-1] = (position, -literal, True)
+            trace.step(lambda: f"Backtracking to level {len(decisions)}: trying {decode_literal(-literal, variables)} instead of "
+                               f"{decode_literal(literal, variables)}.")
+            assign(-literal)
+            continue
+
+        literal = next((lit for index, clause in enumerate(clauses) if not satisfied[index]
+                        for lit in clause if values[abs(lit)] == 0), None)
+        if literal is None:
+            trace.summary("All clauses have been satisfied. The formula is satisfiable.")
+            return {var: values[var] == 1 for var in range(1, len(variables) + 1)}
+        decisions.append((len(trail), literal, False))
+        stats["decisions"] += 1
+        trace.step(lambda: f"Splitting on literal: {decode_literal(literal, variables)} (level {len(decisions)})")
+        assign(literal)
+
+
+def dpll(clauses, variables=None, backend="dpll", trace=None, budget=None):
+    trace = get_tracer(trace)
+    budget = get_budget(budget)
+    started = time.perf_counter()
+    clauses, variables = as_int_clauses(clauses, variables)
+    try:
+        if budget is not None:
+            budget.check_clauses(len(clauses), "dpll")
+        if backend == "cdcl":
+            result = solve_with_cdcl(clauses, variables, trace, budget)
+        elif backend != "dpll":
+            raise Exception(f"Unknown satisfiability backend {backend}.")
+        else:
+            trace.summary(lambda: f"Calculating satisfiability for the clauses: {get_printed_clauses(clauses, variables)}.")
+            stats = {"decisions": 0, "propagations": 0, "conflicts": 0}
+            interpretation = iterative_dpll(clauses, variables, trace, budget, stats)
+            record_stats(stats)
+            model = None if interpretation is None else {variables[var - 1]: value for var, value in interpretation.items()}
+            result = SatResult(interpretation is not None, model, "dpll", stats)
+    except ResourceExhausted as e:
+        trace.summary(lambda: f"Stopped the satisfiability check. {e}")
+        raise
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def check_validity(node, backend="dpll", session=None, trace=None, budget=None):
+    trace = get_tracer(trace)
+    budget = get_budget(budget)
+    started = time.perf_counter()
+    trace.summary("To check if a formula is valid, we check if it's negation is unsatisfiable.")
+    if session is not None:
+        trace.summary("The negation is added to the incremental solver session behind a fresh selector literal.")
+        valid = session.entails(node)
+        result = ValidityResult(valid, None if valid else session.get_model(), "session", {"queries": session.queries})
+    elif backend == "bdd":
+        trace.summary("The negation is unsatisfiable exactly when the reduced ordered BDD of the formula is the constant ⊤.")
+        try:
+            result = check_validity_bdd(node, budget)
+        except ResourceExhausted as e:
+            trace.summary(lambda: f"The validity of {get_node_expression(node)} is unknown. {e}")
+            raise
+    else:
+        negated_node = Node("¬", children=[duplicate_node(node)])
+        try:
+            if backend == "cdcl" and not trace.enabled(SUMMARY):
+                variables = []
+                res = solve_clause_stream(iter_int_clauses(negated_node, variables, trace, budget), variables, trace, budget)
+            else:
+                res = dpll(*node_to_int_clauses(negated_node, trace=trace, budget=budget), backend=backend, trace=trace, budget=budget)
+        except ResourceExhausted as e:
+            trace.summary(lambda: f"The validity of {get_node_expression(node)} is unknown. {e}")
+            raise
+        result = ValidityResult(not res, res.model, backend, res.stats)
+    if not result:
+        trace.summary(lambda: f"Therefore, the formula {get_node_expression(node)} is invalid.")
     else:
-        print(f"Therefore, the formula {get_node_expression(node)} is valid.")
+        trace.summary(lambda: f"Therefore, the formula {get_node_expression(node)} is valid.")
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,99 @@
+class Result:
+    __slots__ = ()
+
+    def fields(self):
+        return [name for cls in reversed(type(self).__mro__) for name in getattr(cls, "__slots__", ())]
+
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.fields()}
+
+
+    def __str__(self):
+        return render_result(self)
+
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{name}={getattr(self, name)!r}' for name in self.fields())})"
+
+
+class SatResult(Result):
+    __slots__ = ("satisfiable", "model", "method", "stats", "seconds")
+
+    def __init__(self, satisfiable, model=None, method=None, stats=None, seconds=0.0):
+        self.satisfiable = satisfiable
+        self.model = model
+        self.method = method
+        self.stats = stats if stats is not None else {}
+        self.seconds = seconds
+
+
+    def __bool__(self):
+        return self.satisfiable
+
+
+class InterpretationResult(SatResult):
+    __slots__ = ()
+
+
+class ValidityResult(Result):
+    __slots__ = ("valid", "counterexample", "method", "stats", "seconds")
+
+    def __init__(self, valid, counterexample=None, method=None, stats=None, seconds=0.0):
+        self.valid = valid
+        self.counterexample = counterexample
+        self.method = method
+        self.stats = stats if stats is not None else {}
+        self.seconds = seconds
+
+
+    def __bool__(self):
+        return self.valid
+
+
+class EquivalenceResult(Result):
+    __slots__ = ("equivalent", "counterexample", "seconds")
+
+    def __init__(self, equivalent, counterexample=None, seconds=0.0):
+        self.equivalent = equivalent
+        self.counterexample = counterexample
+        self.seconds = seconds
+
+
+    def __bool__(self):
+        return self.equivalent
+
+
+def render_satisfiability(result):
+    return str(result.satisfiable)
+
+
+def render_interpretation(result):
+    if not result.satisfiable:
+        return "Unsatisfiable proposition has no satisfying truth valuation."
+    if not result.model:
+        return "Any interpretation is a satisfying truth valuation."
+    return f"A satisfying truth valuation is: {result.model}"
+
+
+def render_validity(result):
+    return str(result.valid)
+
+
+def render_equivalence(result):
+    return str(result.equivalent)
+
+
+renderers = {
+    SatResult: render_satisfiability,
+    InterpretationResult: render_interpretation,
+    ValidityResult: render_validity,
+    EquivalenceResult: render_equivalence,
+}
+
+
+def render_result(result):
+    for cls in type(result).__mro__:
+        if cls in renderers:
+            return renderers[cls](result)
+    return repr(result)
@@ -0,0 +1,41 @@
+import io
+import json
+import unittest
+
+from main import InputFormatError, iter_json_array, iter_records
+
+
+def read_array(text, chunk_size=3):
+    return list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+
+
+class JsonArrayReaderTest(unittest.TestCase):
+    def test_reads_across_chunk_boundaries(self):
+        records = [{"proposition": "A7 ∧ B"}, 12345, "text", [1, 2]]
+        text = json.dumps(records, ensure_ascii=False, indent=1)
+        for chunk_size in [1, 2, 5, 64]:
+            self.assertEqual(read_array(text, chunk_size), records)
+        self.assertEqual(read_array(" [ ] "), [])
+
+
+    def test_rejects_malformed_arrays(self):
+        for text in ["[1 2]", "[1,]", "[,1]", "[1, 2", "[1, {]", '{"proposition": "A"}', "[1 [2]]"]:
+            with self.subTest(text=text):
+                with self.assertRaises(InputFormatError):
+                    read_array(text)
+
+
+    def test_elements_before_the_error_are_yielded(self):
+        records = iter_json_array(io.StringIO('[{"proposition": "A"} {"proposition": "B"}]'))
+        self.assertEqual(next(records), {"proposition": "A"})
+        with self.assertRaises(InputFormatError):
+            next(records)
+
+
+    def test_format_detection(self):
+        self.assertEqual(list(iter_records(io.StringIO('  [{"proposition": "A"}, {"proposition": "B"}]'))), [{"proposition": "A"}, {"proposition": "B"}])
+        self.assertEqual(list(iter_records(io.StringIO('{"proposition": "A"}\n\n{"proposition": "B"}\n'))), [{"proposition": "A"}, {"proposition": "B"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import itertools
+import random
+import unittest
+
+from bdd import BDD
+from utility import Node, compile_formula, get_variables
+
+VARIABLES = [f"X{i}" for i in range(1, 11)]
+
+
+class CountingBDD(BDD):
+    def __init__(self, *args, **kwargs):
+        self.collections = 0
+        self.reorders = 0
+        super().__init__(*args, **kwargs)
+
+
+    def collect_garbage(self):
+        self.collections += 1
+        super().collect_garbage()
+
+
+    def reorder(self, max_growth=1.2):
+        self.reorders += 1
+        super().reorder(max_growth)
+
+
+def random_formula(rng, depth):
+    if depth == 0 or rng.random() < 0.15:
+        return Node(rng.choice(VARIABLES))
+    connective = rng.choice(["∧", "∨", "⇒", "⇔", "¬"])
+    if connective == "¬":
+        return Node("¬", children=[random_formula(rng, depth - 1)])
+    return Node(connective, children=[random_formula(rng, depth - 1), random_formula(rng, depth - 1)])
+
+
+def truth_table_models(node, variables):
+    compiled = compile_formula(node)
+    return sum(compiled.evaluate(dict(zip(variables, values))) for values in itertools.product([False, True], repeat=len(variables)))
+
+
+class BDDGarbageCollectionAndReorderingTest(unittest.TestCase):
+    def test_agrees_with_a_static_order_and_the_truth_table(self):
+        rng = random.Random(5)
+        collections = reorders = 0
+        for _ in range(12):
+            node = random_formula(rng, 7)
+            variables = sorted(get_variables(node))
+            dynamic = CountingBDD(gc_threshold=8, reorder_threshold=16)
+            static = BDD(reordering=False)
+            u = dynamic.from_node(node)
+            v = static.from_node(node)
+            count = truth_table_models(node, variables)
+            self.assertEqual(dynamic.count_models(u, variables), count)
+            self.assertEqual(static.count_models(v, variables), count)
+            for manager, root in [(dynamic, u), (static, v)]:
+                model = manager.get_model(root, variables)
+                if count:
+                    self.assertTrue(compile_formula(node).evaluate(model))
+                else:
+                    self.assertIsNone(model)
+            collections += dynamic.collections
+            reorders += dynamic.reorders
+        self.assertGreater(collections, 0)
+        self.assertGreater(reorders, 0)
+
+
+    def test_roots_survive_collection_and_reordering(self):
+        rng = random.Random(9)
+        manager = CountingBDD(VARIABLES, gc_threshold=8, reorder_threshold=16)
+        nodes = [random_formula(rng, 6) for _ in range(8)]
+        roots = [manager.from_node(node) for node in nodes]
+        manager.collect_garbage()
+        manager.reorder()
+        self.assertGreater(manager.reorders, 1)
+        for node, root in zip(nodes, roots):
+            self.assertEqual(manager.count_models(root, VARIABLES), truth_table_models(node, VARIABLES))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import unittest
+
+import main
+from bdd import check_equivalence_bdd, count_models
+from budget import Budget, ResourceExhausted
+from normal_form import transform_to_normal_form
+from resolution import check_validity, dpll, find_satisfying_interpretation, resolution
+from wff import relaxed_to_strong
+
+
+def parse(proposition):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return relaxed_to_strong(proposition, False)
+
+
+def disjunction_of_pairs(count):
+    return parse(" ∨ ".join(f"(A{i} ∧ B{i})" for i in range(count)))
+
+
+class DistributionBudgetTest(unittest.TestCase):
+    def test_nodes_are_counted_once(self):
+        budget = Budget(max_nodes=100000)
+        result = transform_to_normal_form(disjunction_of_pairs(8), "cnf", "silent", budget)
+        self.assertEqual(len(result.children), 256)
+
+
+    def test_node_budget_counts_the_created_literals(self):
+        transform_to_normal_form(disjunction_of_pairs(8), "cnf", "silent", Budget(max_nodes=5000))
+        with self.assertRaises(ResourceExhausted) as raised:
+            transform_to_normal_form(disjunction_of_pairs(8), "cnf", "silent", Budget(max_nodes=2000))
+        self.assertEqual(raised.exception.resource, "nodes")
+
+
+    def test_clause_budget(self):
+        with self.assertRaises(ResourceExhausted) as raised:
+            transform_to_normal_form(disjunction_of_pairs(10), "cnf", "silent", Budget(max_clauses=500))
+        self.assertEqual(raised.exception.resource, "clauses")
+
+
+class ExhaustionContractTest(unittest.TestCase):
+    def test_solvers_raise_when_exhausted(self):
+        clauses = [{1, 2}, {-1, 2}, {1, -2}, {-1, -2}]
+        with self.assertRaises(ResourceExhausted):
+            dpll(clauses, ["A", "B"], budget=Budget(max_clauses=2))
+        with self.assertRaises(ResourceExhausted):
+            resolution(clauses, dp=False, variables=["A", "B"], budget=Budget(max_resolvents=1))
+        with self.assertRaises(ResourceExhausted):
+            find_satisfying_interpretation([[f"A{i}", f"B{i}"] for i in range(200)], backend="dpll", budget=Budget(max_seconds=0))
+
+
+    def test_validity_and_bdd_raise_when_exhausted(self):
+        conjunction = parse(" ∧ ".join(f"(A{i} ∨ B{i})" for i in range(10)))
+        for backend in ["dpll", "cdcl", "bdd"]:
+            with self.assertRaises(ResourceExhausted):
+                check_validity(conjunction, backend, trace="silent", budget=Budget(max_clauses=100, max_nodes=10))
+        with self.assertRaises(ResourceExhausted):
+            count_models(disjunction_of_pairs(10), Budget(max_nodes=10))
+        with self.assertRaises(ResourceExhausted):
+            check_equivalence_bdd(disjunction_of_pairs(10), disjunction_of_pairs(9), Budget(max_nodes=10))
+
+
+    def test_records_report_exhaustion(self):
+        record = {"proposition": " ∨ ".join(f"(A{i} ∧ B{i})" for i in range(10)), "instructions": "cnf", "budget": {"max_clauses": 100}, "trace": "silent"}
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = main.process_element(record)
+        self.assertEqual(result["exhausted"]["resource"], "clauses")
+        self.assertEqual(result["results"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
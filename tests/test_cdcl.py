@@ -0,0 +1,83 @@
+import itertools
+import random
+import unittest
+
+from cdcl import CDCLSolver, luby
+from resolution import dpll
+
+
+def random_3cnf(rng, variables, clauses):
+    return [{rng.choice([1, -1]) * variable for variable in rng.sample(range(1, variables + 1), 3)} for _ in range(clauses)]
+
+
+def pigeonhole(holes):
+    pigeons = holes + 1
+    variable = lambda pigeon, hole: pigeon * holes + hole + 1
+    clauses = [{variable(pigeon, hole) for hole in range(holes)} for pigeon in range(pigeons)]
+    for hole in range(holes):
+        for first, second in itertools.combinations(range(pigeons), 2):
+            clauses.append({-variable(first, hole), -variable(second, hole)})
+    return clauses, pigeons * holes
+
+
+def satisfies(model, clauses):
+    return all(any(model[abs(literal)] == (literal > 0) for literal in clause) for clause in clauses)
+
+
+class CDCLSolverTest(unittest.TestCase):
+    def test_agrees_with_dpll(self):
+        rng = random.Random(7)
+        verdicts = set()
+        for _ in range(150):
+            count = rng.randint(3, 20)
+            clauses = random_3cnf(rng, count, rng.randint(1, 5 * count))
+            solver = CDCLSolver([list(clause) for clause in clauses], count)
+            result = solver.solve()
+            expected = dpll([set(clause) for clause in clauses], [f"X{i}" for i in range(1, count + 1)])
+            self.assertEqual(result, bool(expected), clauses)
+            verdicts.add(result)
+        self.assertEqual(verdicts, {True, False})
+
+
+    def test_models_satisfy_every_clause(self):
+        rng = random.Random(11)
+        for _ in range(100):
+            count = rng.randint(5, 40)
+            clauses = random_3cnf(rng, count, 3 * count)
+            solver = CDCLSolver([list(clause) for clause in clauses], count)
+            if solver.solve():
+                self.assertTrue(satisfies(solver.model, clauses), clauses)
+            else:
+                self.assertIsNone(solver.model)
+
+
+    def test_pigeonhole_is_unsatisfiable_across_restarts(self):
+        clauses, count = pigeonhole(5)
+        solver = CDCLSolver([list(clause) for clause in clauses], count, restart_base=2)
+        self.assertFalse(solver.solve())
+        self.assertGreater(solver.stats["conflicts"], 0)
+        self.assertGreater(solver.stats["restarts"], 0)
+
+
+    def test_assumptions_agree_with_unit_clauses(self):
+        rng = random.Random(3)
+        for _ in range(40):
+            count = rng.randint(4, 12)
+            clauses = random_3cnf(rng, count, rng.randint(count, 4 * count))
+            incremental = CDCLSolver([list(clause) for clause in clauses], count)
+            for _ in range(5):
+                assumptions = [rng.choice([1, -1]) * variable for variable in rng.sample(range(1, count + 1), rng.randint(1, 3))]
+                fresh = CDCLSolver([list(clause) for clause in clauses] + [[literal] for literal in assumptions], count)
+                expected = fresh.solve()
+                self.assertEqual(incremental.solve(assumptions), expected, (clauses, assumptions))
+                if expected:
+                    self.assertTrue(satisfies(incremental.model, clauses + [{literal} for literal in assumptions]))
+            self.assertEqual(incremental.solve(), CDCLSolver([list(clause) for clause in clauses], count).solve())
+
+
+    def test_luby_sequence(self):
+        self.assertEqual([luby(i) for i in range(15)], [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from resolution import get_printed_clause
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = """
+import contextlib, io
+from resolution import strong_to_clausal
+from wff import relaxed_to_strong
+with contextlib.redirect_stdout(io.StringIO()):
+    clauses = [strong_to_clausal(relaxed_to_strong(p, False)) for p in ["(P ⇒ S) ∧ (Q ∨ R ∨ P)", "(S ∨ ¬P) ∧ (R ⇔ Q)"]]
+print(clauses)
+"""
+
+
+class ClausalOutputTest(unittest.TestCase):
+    def test_literals_are_sorted(self):
+        self.assertEqual(get_printed_clause({"S", "¬P"}), "{¬P, S}")
+        self.assertEqual(get_printed_clause({"R", "P", "Q", "¬P"}), "{P, ¬P, Q, R}")
+
+
+    def test_output_does_not_depend_on_hash_seed(self):
+        outputs = set()
+        for seed in ["0", "1", "2", "3"]:
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            outputs.add(subprocess.run([sys.executable, "-c", SCRIPT], cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout)
+        self.assertEqual(len(outputs), 1, outputs)
+
+
+if __name__ == "__main__":
+    unittest.main()
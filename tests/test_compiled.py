@@ -0,0 +1,44 @@
+import contextlib
+import io
+import itertools
+import unittest
+
+from utility import compile_formula, evaluate_truth_table, get_variables
+from wff import relaxed_to_strong
+
+
+def parse(proposition):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return relaxed_to_strong(proposition, False)
+
+
+class CompiledFormulaTest(unittest.TestCase):
+    def test_agrees_with_the_tree_evaluation(self):
+        node = parse("((A ⇒ B) ⇔ ¬C) ∨ (A ∧ ¬D)")
+        compiled = compile_formula(node)
+        variables = sorted(get_variables(node))
+        assignments = [dict(zip(variables, values)) for values in itertools.product([False, True], repeat=len(variables))]
+        expected = [evaluate_truth_table(node, assignment) for assignment in assignments]
+        self.assertEqual(compiled.evaluate_many(assignments), expected)
+        self.assertEqual([compiled.evaluate(assignment) for assignment in assignments], expected)
+
+
+    def test_missing_variables_are_reported_before_evaluating(self):
+        compiled = compile_formula(parse("A ∧ (B ∨ C)"))
+        with self.assertRaisesRegex(Exception, r"Missing truth value for \{'C'\}"):
+            compiled.evaluate({"A": True, "B": False})
+        with self.assertRaisesRegex(Exception, r"Missing truth value for \{'B'\}"):
+            compiled.evaluate_many([{"A": True, "B": True, "C": True}, {"A": False, "C": True}])
+
+
+    def test_key_errors_of_the_assignment_are_not_masked(self):
+        class Assignment(dict):
+            def __getitem__(self, key):
+                raise KeyError("broken lookup")
+
+        with self.assertRaises(KeyError):
+            compile_formula(parse("A ∧ B")).evaluate(Assignment(A=True, B=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
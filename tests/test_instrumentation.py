@@ -0,0 +1,29 @@
+import unittest
+
+from instrumentation import counters, enable_profiling
+from utility import Node, duplicate_node
+
+
+class NodeCounterTest(unittest.TestCase):
+    def tearDown(self):
+        enable_profiling(False)
+
+
+    def test_nodes_are_not_counted_without_profiling(self):
+        enable_profiling(False)
+        before = dict(counters)
+        duplicate_node(Node("∧", children=[Node("A"), Node("B")]))
+        self.assertEqual(counters["nodes"], before["nodes"])
+        self.assertEqual(counters["duplicate_node"], before["duplicate_node"])
+
+
+    def test_nodes_are_counted_with_profiling(self):
+        enable_profiling(True)
+        before = dict(counters)
+        duplicate_node(Node("∧", children=[Node("A"), Node("B")]))
+        self.assertEqual(counters["nodes"] - before["nodes"], 6)
+        self.assertEqual(counters["duplicate_node"] - before["duplicate_node"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import contextlib
+import io
+import random
+import unittest
+
+from normal_form import transform_to_normal_form
+from minimize import EXACT_VARIABLES
+from utility import Node, duplicate_node, get_node_expression, get_truth_columns, get_valid_rows_mask, get_variables
+from wff import relaxed_to_strong
+
+
+def parse(proposition):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return relaxed_to_strong(proposition, False)
+
+
+def random_formula(rng, variables, depth):
+    if depth == 0 or rng.random() < 0.2:
+        return Node(rng.choice(variables))
+    connective = rng.choice(["∧", "∨", "⇒", "⇔", "¬"])
+    if connective == "¬":
+        return Node("¬", children=[random_formula(rng, variables, depth - 1)])
+    return Node(connective, children=[random_formula(rng, variables, depth - 1), random_formula(rng, variables, depth - 1)])
+
+
+def truth_column(node, variables):
+    return get_truth_columns(node, variables)[get_node_expression(node)] & get_valid_rows_mask(variables)
+
+
+class MinimalFormTest(unittest.TestCase):
+    def assert_equivalent(self, node, minimal):
+        variables = sorted(get_variables(node) - {"⊤", "⊥"})
+        self.assertLessEqual(get_variables(minimal) - {"⊤", "⊥"}, set(variables))
+        self.assertEqual(truth_column(minimal, variables), truth_column(node, variables), get_node_expression(node))
+
+
+    def test_exact_minimisation_is_equivalent(self):
+        rng = random.Random(1)
+        variables = [f"X{i}" for i in range(1, 7)]
+        for _ in range(60):
+            node = random_formula(rng, variables, 6)
+            for conversion_type in ["min_dnf", "min_cnf"]:
+                self.assert_equivalent(node, transform_to_normal_form(duplicate_node(node), conversion_type, "silent"))
+
+
+    def test_heuristic_minimisation_is_equivalent(self):
+        rng = random.Random(2)
+        variables = [f"X{i}" for i in range(1, EXACT_VARIABLES + 5)]
+        checked = 0
+        for _ in range(15):
+            node = Node(rng.choice(["∧", "∨"]), children=[random_formula(rng, variables, 3) for _ in range(6)])
+            if len(get_variables(node)) <= EXACT_VARIABLES:
+                continue
+            checked += 1
+            for conversion_type in ["min_dnf", "min_cnf"]:
+                self.assert_equivalent(node, transform_to_normal_form(duplicate_node(node), conversion_type, "silent"))
+        self.assertGreater(checked, 5)
+
+
+    def test_known_minimal_forms(self):
+        self.assertEqual(get_node_expression(transform_to_normal_form(parse("(A ∧ B) ∨ (A ∧ ¬B)"), "min_dnf", "silent")), "A")
+        self.assertEqual(get_node_expression(transform_to_normal_form(parse("(A ∨ B) ∧ (A ∨ ¬B) ∧ ⊤"), "min_cnf", "silent")), "A")
+        wide = " ∨ ".join(f"(A{i} ∧ B{i})" for i in range(7)) + " ∨ (A0 ∧ B0 ∧ C)"
+        minimal = transform_to_normal_form(parse(wide), "min_dnf", "silent")
+        self.assertEqual(len(minimal.children), 7)
+        self.assert_equivalent(parse(wide), minimal)
+
+
+if __name__ == "__main__":
+    unittest.main()
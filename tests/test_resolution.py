@@ -0,0 +1,39 @@
+import itertools
+import random
+import unittest
+
+from resolution import resolution, dpll
+
+
+def random_cnf(rng, variables, clauses):
+    return [{rng.choice([1, -1]) * rng.randint(1, variables) for _ in range(rng.randint(1, 3))} for _ in range(clauses)]
+
+
+def brute_force(clauses, count):
+    return any(all(any(values[abs(literal) - 1] == (literal > 0) for literal in clause) for clause in clauses)
+               for values in itertools.product([False, True], repeat=count))
+
+
+class ResolutionOracleTest(unittest.TestCase):
+    def test_agrees_with_cdcl_and_the_truth_table(self):
+        rng = random.Random(2024)
+        for _ in range(300):
+            count = rng.randint(1, 6)
+            clauses = random_cnf(rng, count, rng.randint(1, 14))
+            variables = [f"X{i}" for i in range(1, count + 1)]
+            expected = brute_force(clauses, count)
+            self.assertEqual(bool(dpll([set(c) for c in clauses], list(variables), backend="cdcl")), expected, clauses)
+            for dp in [True, False]:
+                result = resolution([set(c) for c in clauses], dp=dp, variables=list(variables))
+                self.assertEqual(bool(result), expected, (clauses, dp))
+
+
+    def test_trivial_clause_sets(self):
+        self.assertTrue(resolution([], variables=[]))
+        self.assertFalse(resolution([set()], variables=[]))
+        self.assertFalse(resolution([{1}, {-1}], dp=False, variables=["A"]))
+        self.assertTrue(resolution([{1, -1}], dp=False, variables=["A"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from results import Result, SatResult, InterpretationResult, ValidityResult, render_result
+
+
+class TimingResult(Result):
+    __slots__ = ("seconds",)
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+
+class CountedSatResult(SatResult):
+    __slots__ = ()
+
+
+class RenderResultTest(unittest.TestCase):
+    def test_registered_results(self):
+        self.assertEqual(str(SatResult(True, {"A": True})), "True")
+        self.assertEqual(str(ValidityResult(False, {"A": False})), "False")
+        self.assertEqual(str(InterpretationResult(True, {"A": True})), "A satisfying truth valuation is: {'A': True}")
+
+
+    def test_subclasses_use_the_nearest_renderer(self):
+        self.assertEqual(str(CountedSatResult(False)), "False")
+
+
+    def test_unregistered_results_fall_back_to_repr(self):
+        self.assertEqual(str(TimingResult(0.5)), "TimingResult(seconds=0.5)")
+        self.assertEqual(render_result(TimingResult(0.5)), repr(TimingResult(0.5)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import contextlib
+import io
+import unittest
+
+import main
+from resolution import SatSession
+
+
+def run_quietly(function, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+class SessionCacheTest(unittest.TestCase):
+    def setUp(self):
+        main.sessions.clear()
+
+
+    def tearDown(self):
+        main.sessions.clear()
+
+
+    def test_failed_premise_is_not_cached(self):
+        with self.assertRaises(Exception):
+            run_quietly(main.get_session, ["A", "(A⇒B)∧"])
+        self.assertEqual(main.sessions, {})
+
+
+    def test_later_records_are_not_poisoned(self):
+        bad = run_quietly(main.process_element, {"proposition": "A, (A⇒B)∧ ⊨ A", "incremental": True})
+        self.assertIsNotNone(bad["error"])
+        again = run_quietly(main.process_element, {"proposition": "A, (A⇒B)∧ ⊨ A", "incremental": True})
+        self.assertIsNotNone(again["error"])
+        good = run_quietly(main.process_element, {"proposition": "A, (A⇒B) ⊨ B", "incremental": True})
+        self.assertIs(good["verdict"], True)
+
+
+    def test_sessions_are_reused(self):
+        first = run_quietly(main.get_session, ["A", "A⇒B"])
+        second = run_quietly(main.get_session, ["A⇒B", "A"])
+        self.assertIs(first, second)
+
+
+    def test_shared_validity_session_is_bounded(self):
+        limit = main.MAX_SESSION_QUERIES
+        main.MAX_SESSION_QUERIES = 3
+        try:
+            seen = []
+            for i in range(7):
+                record = {"proposition": f"(A{i} ⇒ B{i}) ∨ (B{i} ⇒ A{i})", "instructions": "check validity", "incremental": True}
+                result = run_quietly(main.process_element, record)
+                self.assertIs(result["results"][0]["result"]["valid"], True)
+                session = main.sessions[()]
+                self.assertLessEqual(session.queries, 3)
+                if session not in seen:
+                    seen.append(session)
+            self.assertEqual(len(seen), 3)
+        finally:
+            main.MAX_SESSION_QUERIES = limit
+
+
+class SatSessionTest(unittest.TestCase):
+    def test_selectors_are_numbered_by_a_counter(self):
+        session = SatSession()
+        selectors = [session.new_selector() for _ in range(5)]
+        self.assertEqual(len(set(selectors)), 5)
+        self.assertEqual(session.selectors, 5)
+        self.assertEqual([session.variables[selector - 1] for selector in selectors], ["s1", "s2", "s3", "s4", "s5"])
+
+
+    def test_selectors_skip_taken_names(self):
+        session = SatSession()
+        session.add_clauses([["s1", "s2"]])
+        self.assertEqual(session.variables[session.new_selector() - 1], "s3")
+
+
+    def test_model_holds_only_the_user_variables(self):
+        session = SatSession(tseitin=True)
+        session.add_formula(main.parse("(A ∨ B) ∧ (¬A ∨ C)"))
+        self.assertFalse(run_quietly(session.entails, main.parse("C")))
+        model = session.get_model()
+        self.assertEqual(set(model), {"A", "B", "C"})
+        self.assertFalse(model["C"])
+        self.assertTrue(model["B"])
+
+
+    def test_model_holds_variables_of_added_clauses(self):
+        session = SatSession()
+        session.add_clauses([["x", "¬y"], ["y"]])
+        self.assertTrue(session.solve())
+        self.assertEqual(session.get_model(), {"x": True, "y": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import random
+import unittest
+
+import main
+from budget import Budget, ResourceExhausted
+from formula import node_to_formula
+from normal_form import transform_to_normal_form, iter_distributed_clauses, clause_set_to_tree
+from resolution import check_validity
+from tracing import set_default_trace
+from utility import Node, duplicate_node, get_node_expression, get_truth_columns, get_variables
+
+
+def flat_disjunction(width):
+    return Node("∨", children=[Node(f"A{i}") for i in range(width)])
+
+
+def random_formula(rng, variables, depth):
+    if depth == 0 or rng.random() < 0.2:
+        return Node(rng.choice(variables))
+    connective = rng.choice(["∧", "∨", "⇒", "⇔", "¬"])
+    if connective == "¬":
+        return Node("¬", children=[random_formula(rng, variables, depth - 1)])
+    return Node(connective, children=[random_formula(rng, variables, depth - 1), random_formula(rng, variables, depth - 1)])
+
+
+class StreamedDistributionTest(unittest.TestCase):
+    def setUp(self):
+        set_default_trace("silent")
+
+
+    def test_wide_flat_disjunction(self):
+        self.assertEqual(list(iter_distributed_clauses(node_to_formula(flat_disjunction(1500)))), [frozenset(f"A{i}" for i in range(1500))])
+        self.assertFalse(check_validity(flat_disjunction(1500), backend="cdcl"))
+        self.assertTrue(main.solve_clauses(flat_disjunction(1500), main.dpll, backend="cdcl"))
+
+
+    def test_validity_of_a_wide_conjunction(self):
+        node = Node("∧", children=[Node(f"A{i}") for i in range(1500)])
+        self.assertFalse(check_validity(node, backend="cdcl"))
+        node.children += (Node("¬", children=[Node("A0")]),)
+        self.assertFalse(check_validity(node, backend="cdcl"))
+
+
+    def test_streamed_clauses_are_equivalent_to_the_formula(self):
+        rng = random.Random(3)
+        variables = [f"X{i}" for i in range(1, 7)]
+        for _ in range(150):
+            node = transform_to_normal_form(random_formula(rng, variables, 5), "nnf", "silent")
+            names = sorted(variables)
+            cnf = clause_set_to_tree(list(iter_distributed_clauses(node_to_formula(node))))
+            self.assertLessEqual(get_variables(cnf) - {"⊤", "⊥"}, set(names))
+            expected = get_truth_columns(node, names)[get_node_expression(node)]
+            self.assertEqual(get_truth_columns(cnf, names)[get_node_expression(cnf)], expected, get_node_expression(node))
+
+
+    def test_budget_stops_the_stream(self):
+        node = Node("∨", children=[Node("∧", children=[Node(f"A{i}"), Node(f"B{i}")]) for i in range(12)])
+        with self.assertRaises(ResourceExhausted):
+            list(iter_distributed_clauses(node_to_formula(node), budget=Budget(max_clauses=100)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import unittest
+
+from normal_form import transform_to_normal_form
+from tracing import Tracer
+from utility import compare_truth_tables, is_valid
+from wff import relaxed_to_strong
+
+
+def parse(proposition):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return relaxed_to_strong(proposition, False)
+
+
+def run_captured(function, *args, **kwargs):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = function(*args, **kwargs)
+    return result, output.getvalue()
+
+
+class TruthTableNarrationTest(unittest.TestCase):
+    def test_silent_comparison_prints_nothing(self):
+        result, output = run_captured(compare_truth_tables, parse("A ⇒ B"), parse("B ⇒ A"), "silent")
+        self.assertEqual(output, "")
+        self.assertFalse(result)
+        self.assertEqual(result.counterexample, {"A": False, "B": True})
+
+
+    def test_counterexample_does_not_depend_on_the_trace_level(self):
+        left, right = parse("(A ∧ C) ∨ B"), parse("A ∨ (B ∧ C)")
+        results = [run_captured(compare_truth_tables, left, right, level)[0] for level in ["silent", "summary", "step", "full"]]
+        self.assertEqual([result.counterexample for result in results], [results[0].counterexample] * 4)
+
+
+    def test_full_comparison_prints_every_row_until_the_difference(self):
+        stream = io.StringIO()
+        compare_truth_tables(parse("A ⇒ B"), parse("B ⇒ A"), Tracer("full", stream))
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[0], "Comparing (A ⇒ B) and (B ⇒ A):")
+        self.assertEqual(len([line for line in lines if line.startswith("Assignments:")]), 2)
+        self.assertTrue(lines[-1].startswith("Results differ:"))
+
+
+    def test_silent_validity_prints_nothing(self):
+        result, output = run_captured(is_valid, parse("A ∨ B"), trace="silent")
+        self.assertEqual(output, "")
+        self.assertFalse(result)
+        stream = io.StringIO()
+        is_valid(parse("A ∨ B"), trace=Tracer("step", stream))
+        self.assertEqual(stream.getvalue().splitlines()[0], "Failed case at row 1:")
+
+
+class ConversionTypeTest(unittest.TestCase):
+    def test_unknown_conversion_type_raises(self):
+        with self.assertRaises(ValueError):
+            transform_to_normal_form(parse("A ∧ B"), "anf", "silent")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+SILENT = 0
+SUMMARY = 1
+STEP = 2
+FULL = 3
+LEVELS = {"silent": SILENT, "summary": SUMMARY, "step": STEP, "full": FULL}
+
+
+class Tracer:
+    __slots__ = ("level", "stream")
+
+    def __init__(self, level=SILENT, stream=None):
+        self.level = get_trace_level(level)
+        self.stream = stream
+
+
+    def enabled(self, level):
+        return self.level >= level
+
+
+    def summary(self, message, end="\n"):
+        if self.level >= SUMMARY:
+            print(message() if callable(message) else message, end=end, file=self.stream)
+
+
+    def step(self, message, end="\n"):
+        if self.level >= STEP:
+            print(message() if callable(message) else message, end=end, file=self.stream)
+
+
+    def full(self, message, end="\n"):
+        if self.level >= FULL:
+            print(message() if callable(message) else message, end=end, file=self.stream)
+
+
+    def tree(self, node, indentation=0, level=STEP):
+        from utility import get_printed_tree, get_node_expression
+        if self.level >= FULL:
+            print(get_printed_tree(node, indentation), end="", file=self.stream)
+        elif self.level >= level:
+            print("\t" * indentation + get_node_expression(node), file=self.stream)
+
+
+def get_trace_level(level):
+    if type(level) == int:
+        return level
+    if level.lower() not in LEVELS:
+        raise Exception(f"Unknown trace level {level}. Use one of: {', '.join(LEVELS)}.")
+    return LEVELS[level.lower()]
+
+
+default_tracer = Tracer(SILENT)
+
+
+def set_default_trace(level):
+    default_tracer.level = get_trace_level(level)
+
+
+def get_tracer(trace=None):
+    if trace is None:
+        return default_tracer
+    if type(trace) == Tracer:
+        return trace
+    return Tracer(trace)
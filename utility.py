@@ -1,15 +1,49 @@
+import time
 from anytree import NodeMixin, RenderTree
-from itertools import product
+from instrumentation import counters, profiler
+from results import ValidityResult, EquivalenceResult
+from tracing import get_tracer, SUMMARY, STEP, FULL
 
 
 class Node(NodeMixin):
     def __init__(self, name, parent=None, children=None, in_parenthesis=False):
+        if profiler.enabled:
+            counters["nodes"] += 1
+        self._expression = None
+        self._variables = None
         self.name = name
         self.parent = parent
         self.children = children if children is not None else []
         self.in_parenthesis = in_parenthesis
 
 
+    @property
+    def name(self):
+        return self._name
+
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        self.invalidate_cache()
+
+
+    def invalidate_cache(self):
+        node = self
+        while node is not None and (node._expression is not None or node._variables is not None):
+            node._expression = None
+            node._variables = None
+            node = node.parent
+
+
+    def _post_attach(self, parent):
+        parent.invalidate_cache()
+
+
+    def _post_detach(self, parent):
+        parent.invalidate_cache()
+
+
 def print_tree(root, indentation = 0):
     indent = '\t'*indentation
     for pre, _, node in RenderTree(root):
@@ -29,32 +63,45 @@ def is_chr(char):
 
 
 def get_variables(node):
-    return {node.name} if node.name[0].isupper() and all(c.isalnum() for c in node.name) or node.name in ['⊤', '⊥'] else {var for child in node.children for var in get_variables(child)}
+    if node._variables is None:
+        if node.name[0].isupper() and all(c.isalnum() for c in node.name) or node.name in ['⊤', '⊥']:
+            node._variables = frozenset([node.name])
+        else:
+            variables = set()
+            for child in node.children:
+                variables |= get_variables(child)
+            node._variables = frozenset(variables)
+    return node._variables
 
 
 def get_node_expression(node):
-    if node.is_leaf:
-        return node.name
-    elif node.name == "¬":
-        return f"(¬{get_node_expression(node.children[0])})"
-    elif node.name in ["∧", "∨"]:
-        child_expressions = [get_node_expression(child) for child in node.children]
-        return f"({f' {node.name} '.join(child_expressions)})"
-    elif node.name in ["⇒", "⇔"]:
-        left_expr = get_node_expression(node.children[0])
-        right_expr = get_node_expression(node.children[1])
-        return f"({left_expr} {node.name} {right_expr})"
-    return node.name
+    if node._expression is None:
+        if node.is_leaf:
+            node._expression = node.name
+        elif node.name == "¬":
+            node._expression = f"(¬{get_node_expression(node.children[0])})"
+        elif node.name in ["∧", "∨"]:
+            child_expressions = [get_node_expression(child) for child in node.children]
+            node._expression = f"({f' {node.name} '.join(child_expressions)})"
+        elif node.name in ["⇒", "⇔"]:
+            left_expr = get_node_expression(node.children[0])
+            right_expr = get_node_expression(node.children[1])
+            node._expression = f"({left_expr} {node.name} {right_expr})"
+        else:
+            node._expression = node.name
+    return node._expression
 
 
 def get_all_nodes(node):
-    nodes = [n for n in get_variables(node)]
+    nodes = sorted(get_variables(node))
+    seen = set(nodes)
     def traverse(n):
         for child in n.children:
             traverse(child)
         if not n.is_leaf:
             expression = get_node_expression(n)
-            if expression not in nodes:
+            if expression not in seen:
+                seen.add(expression)
                 nodes.append(expression)
     traverse(node)
     return nodes
@@ -71,34 +118,89 @@ def evaluate_expression(tree_formula, expression, assignment, intermediary=None)
     return evaluate_truth_table(sub_expr_node, assignment, intermediary)
 
 
+def get_variable_column(index, count):
+    block = 1 << (count - index - 1)
+    unit = ((1 << block) - 1) << block
+    return unit * (((1 << (1 << count)) - 1) // ((1 << (2 * block)) - 1))
+
+
+def get_truth_columns(tree_formula, variables):
+    missing_vars = get_variables(tree_formula) - set(variables) - {"⊤", "⊥"}
+    if missing_vars:
+        raise Exception(f"Missing truth value for {missing_vars}")
+
+    full = (1 << (1 << len(variables))) - 1
+    columns = {var: get_variable_column(i, len(variables)) for i, var in enumerate(variables)}
+    columns["⊤"] = full
+    columns["⊥"] = 0
+
+    def evaluate(n):
+        if n.is_leaf:
+            return columns[n.name]
+        results = [evaluate(child) for child in n.children]
+        if n.name == "¬":
+            column = full ^ results[0]
+        elif n.name == "∧":
+            column = full
+            for result in results:
+                column &= result
+        elif n.name == "∨":
+            column = 0
+            for result in results:
+                column |= result
+        elif n.name == "⇒":
+            column = (full ^ results[0]) | results[1]
+        elif n.name == "⇔":
+            column = full ^ (results[0] ^ results[1])
+        else:
+            raise Exception(f"Unknown connective {n.name}.")
+        columns[get_node_expression(n)] = column
+        return column
+
+    evaluate(tree_formula)
+    return columns
+
+
+def get_valid_rows_mask(variables):
+    mask = (1 << (1 << len(variables))) - 1
+    for i, var in enumerate(variables):
+        if var == "⊤":
+            mask &= get_variable_column(i, len(variables))
+        elif var == "⊥":
+            mask &= ~get_variable_column(i, len(variables))
+    return mask
+
+
+def get_column_bits(column, count):
+    return format(column, f"0{1 << count}b")[::-1]
+
+
+def get_truth_table_rows(variables, columns, headers, mask):
+    bits = {header: get_column_bits(columns[header], len(variables)) for header in set(variables) | set(headers)}
+    valid = get_column_bits(mask, len(variables))
+    table = []
+    for index, flag in enumerate(valid):
+        if flag == "1":
+            row = {var: bits[var][index] == "1" for var in variables}
+            for header in headers:
+                row[header] = bits[header][index] == "1"
+            table.append(row)
+    return table
+
+
+def get_truth_table_row(variables, columns, headers, index):
+    row = {var: bool(columns[var] >> index & 1) for var in variables}
+    for header in headers:
+        row[header] = bool(columns[header] >> index & 1)
+    return row
+
+
 def generate_truth_table(tree_formula, variables=None):
     if variables is None:
         variables = sorted(get_variables(tree_formula))
-    truth_values = list(product([False, True], repeat=len(variables)))
-    table = []
     headers = get_all_nodes(tree_formula)
-
-    for values in truth_values:
-        assignment = dict(zip(variables, values))
-        if "⊤" in assignment and not assignment["⊤"]:
-            continue
-        if "⊥" in assignment and assignment["⊥"]:
-            continue
-        row = {var: assignment[var] for var in variables}
-        intermediary_results = {}
-        for formula in headers:
-            result = evaluate_expression(tree_formula, formula, assignment, intermediary_results)
-            row[formula] = result
-        table.append(row)
-
-    unique_table = []
-    seen = set()
-    for row in table:
-        row_tuple = tuple(row.items())
-        if row_tuple not in seen:
-            seen.add(row_tuple)
-            unique_table.append(row)
-    return unique_table
+    columns = get_truth_columns(tree_formula, variables)
+    return get_truth_table_rows(variables, columns, headers, get_valid_rows_mask(variables))
 
 
 def get_printed_truth_table(tree_formula, table=None):
@@ -122,90 +224,180 @@ def get_printed_truth_table(tree_formula, table=None):
 def evaluate_truth_table(node, values, intermediary=None):
     if intermediary is None:
         intermediary = {}
-    required_vars = get_variables(node)
-    missing_vars = required_vars - values.keys()
+    missing_vars = get_variables(node) - values.keys()
     if missing_vars:
         raise Exception(f"Missing truth value for {missing_vars}")
 
-    if node in intermediary:
-        return intermediary[node]
-
-    if node.name == "⊤":
-        result = True
-    elif node.name == "⊥":
-        result = False
-    elif node.name == "¬":
-        result = not evaluate_truth_table(node.children[0], values, intermediary)
-    elif node.name == "∧":
-        result = all(evaluate_truth_table(child, values, intermediary) for child in node.children)
-    elif node.name == "∨":
-        result = any(evaluate_truth_table(child, values, intermediary) for child in node.children)
-    elif node.name == "⇒":
-        left_result = evaluate_truth_table(node.children[0], values, intermediary)
-        right_result = evaluate_truth_table(node.children[1], values, intermediary)
-        result = not left_result or right_result
-    elif node.name == "⇔":
-        left_result = evaluate_truth_table(node.children[0], values, intermediary)
-        right_result = evaluate_truth_table(node.children[1], values, intermediary)
-        result = left_result == right_result
-    else:
-        result = values[node.name]
-
-    intermediary[node] = result
-    return result
-
-
-def compare_truth_tables(left, right):
+    def evaluate(n):
+        if n in intermediary:
+            return intermediary[n]
+
+        if n.name == "⊤":
+            result = True
+        elif n.name == "⊥":
+            result = False
+        elif n.name == "¬":
+            result = not evaluate(n.children[0])
+        elif n.name == "∧":
+            result = all(evaluate(child) for child in n.children)
+        elif n.name == "∨":
+            result = any(evaluate(child) for child in n.children)
+        elif n.name == "⇒":
+            left_result = evaluate(n.children[0])
+            right_result = evaluate(n.children[1])
+            result = not left_result or right_result
+        elif n.name == "⇔":
+            left_result = evaluate(n.children[0])
+            right_result = evaluate(n.children[1])
+            result = left_result == right_result
+        else:
+            result = values[n.name]
+
+        intermediary[n] = result
+        return result
+
+    return evaluate(node)
+
+
+class CompiledFormula:
+    def __init__(self, node):
+        self.expression = get_node_expression(node)
+        self.variables = frozenset(get_variables(node) - {"⊤", "⊥"})
+        self.source = ""
+        self.function = self.compile(node)
+
+
+    def compile(self, node):
+        lines = ["def evaluate(a):"]
+        registers = {"⊤": "True", "⊥": "False"}
+
+        def emit(n):
+            expression = get_node_expression(n)
+            if expression in registers:
+                return registers[expression]
+            if n.is_leaf:
+                code = f"bool(a[{n.name!r}])"
+            else:
+                operands = [emit(child) for child in n.children]
+                if n.name == "¬":
+                    code = f"not {operands[0]}"
+                elif n.name == "∧":
+                    code = " and ".join(operands)
+                elif n.name == "∨":
+                    code = " or ".join(operands)
+                elif n.name == "⇒":
+                    code = f"not {operands[0]} or {operands[1]}"
+                elif n.name == "⇔":
+                    code = f"{operands[0]} == {operands[1]}"
+                else:
+                    raise Exception(f"Unknown connective {n.name}.")
+            register = f"t{len(registers) - 2}"
+            lines.append(f"    {register} = {code}")
+            registers[expression] = register
+            return register
+
+        lines.append(f"    return {emit(node)}")
+        self.source = "\n".join(lines)
+        namespace = {}
+        exec(self.source, namespace)
+        return namespace["evaluate"]
+
+
+    def check_assignment(self, assignment):
+        if not self.variables <= assignment.keys():
+            raise Exception(f"Missing truth value for {set(self.variables - assignment.keys())}")
+
+
+    def evaluate(self, assignment):
+        self.check_assignment(assignment)
+        return self.function(assignment)
+
+
+    def evaluate_many(self, assignments):
+        function = self.function
+        results = []
+        for assignment in assignments:
+            self.check_assignment(assignment)
+            results.append(function(assignment))
+        return results
+
+
+def compile_formula(node):
+    return CompiledFormula(node)
+
+
+def compare_truth_tables(left, right, trace=None):
+    trace = get_tracer(trace)
+    started = time.perf_counter()
     variables = sorted(get_variables(left).union(get_variables(right)))
-    left_table = generate_truth_table(left, variables=variables)
-    right_table = generate_truth_table(right, variables=variables)
-    left_headers = get_all_nodes(left)
-    right_headers = get_all_nodes(right)
-
-    print(f"Comparing {get_node_expression(left)} and {get_node_expression(right)}:")
-
-    equivalent = True
-    for left_row, right_row in zip(left_table, right_table):
-        left_result = left_row[left_headers[-1]]
-        right_result = right_row[right_headers[-1]]
-
-        assignments = {var: left_row[var] for var in variables}
-        print(f"Assignments: {assignments} | Left side result: {left_result}, Right side result: {right_result}")
-
-        if left_result != right_result:
-            equivalent = False
-            print(f"Results differ: Left side result: {left_result}, Right side result: {right_result}")
-            break
+    mask = get_valid_rows_mask(variables)
+    left_column = get_truth_columns(left, variables)[get_node_expression(left)]
+    right_column = get_truth_columns(right, variables)[get_node_expression(right)]
+
+    trace.summary(lambda: f"Comparing {get_node_expression(left)} and {get_node_expression(right)}:")
+
+    differing = (left_column ^ right_column) & mask
+    equivalent = not differing
+    counterexample = None
+    if trace.enabled(FULL):
+        variable_bits = {var: get_column_bits(get_variable_column(i, len(variables)), len(variables)) for i, var in enumerate(variables)}
+        left_bits = get_column_bits(left_column, len(variables))
+        right_bits = get_column_bits(right_column, len(variables))
+        for index, flag in enumerate(get_column_bits(mask, len(variables))):
+            if flag != "1":
+                continue
+            left_result = left_bits[index] == "1"
+            right_result = right_bits[index] == "1"
+
+            assignments = {var: variable_bits[var][index] == "1" for var in variables}
+            trace.full(f"Assignments: {assignments} | Left side result: {left_result}, Right side result: {right_result}")
+
+            if left_result != right_result:
+                trace.full(f"Results differ: Left side result: {left_result}, Right side result: {right_result}")
+                counterexample = assignments
+                break
+    elif differing:
+        index = (differing & -differing).bit_length() - 1
+        counterexample = {var: bool(get_variable_column(i, len(variables)) >> index & 1) for i, var in enumerate(variables)}
+        trace.step(lambda: f"Results differ: Left side result: {bool(left_column >> index & 1)}, Right side result: {bool(right_column >> index & 1)}")
 
     if equivalent:
-        print("The formulas on both sides of '∼' are equivalent.")
-    return equivalent
-
+        trace.summary("The formulas on both sides of '∼' are equivalent.")
+    return EquivalenceResult(equivalent, counterexample, time.perf_counter() - started)
+
+
+def is_valid(node, truth_table=None, trace=None):
+    trace = get_tracer(trace)
+    started = time.perf_counter()
+    if truth_table is not None:
+        prop_header = get_all_nodes(node)[-1]
+        for idx, row in enumerate(truth_table):
+            if not row[prop_header]:
+                trace.summary(lambda: f"Failed case at row {idx + 1}:")
+                trace.step(lambda: f"Interpretation: {row}")
+                return ValidityResult(False, row, "truth table", {"row": idx + 1}, time.perf_counter() - started)
+        return ValidityResult(True, None, "truth table", {"rows": len(truth_table)}, time.perf_counter() - started)
 
-def is_valid(node, truth_table=None):
-    if truth_table is None:
-        truth_table = generate_truth_table(node)
-
-    prop_header = get_all_nodes(node)[-1]
-    for idx, row in enumerate(truth_table):
-        if not row[prop_header]:
-            print(f"Failed case at row {idx + 1}:")
-            print(f"Interpretation: {row}")
-            return False
-    return True
+    variables = sorted(get_variables(node))
+    mask = get_valid_rows_mask(variables)
+    columns = get_truth_columns(node, variables)
+    failed = mask & ~columns[get_node_expression(node)]
+    if failed:
+        index = (failed & -failed).bit_length() - 1
+        row_number = bin(mask & ((1 << index) - 1)).count("1") + 1
+        row = get_truth_table_row(variables, columns, get_all_nodes(node), index)
+        trace.summary(lambda: f"Failed case at row {row_number}:")
+        trace.step(lambda: f"Interpretation: {row}")
+        return ValidityResult(False, row, "truth table", {"row": row_number}, time.perf_counter() - started)
+    return ValidityResult(True, None, "truth table", {"rows": bin(mask).count("1")}, time.perf_counter() - started)
 
 
 def check_tabel_validity(node):
-    truth_table = []
     variables = sorted(get_variables(node))
-    truth_values = list(product([False, True], repeat=len(variables)))
-    for values in truth_values:
-        assignment = dict(zip(variables, values))
-        result = evaluate_truth_table(node, assignment)
-        truth_table.append(result)
-    satisfiable = any(result for result in truth_table)
-    unsatisfiable = all(not result for result in truth_table)
-    valid = all(result for result in truth_table)
+    column = get_truth_columns(node, variables)[get_node_expression(node)]
+    satisfiable = column != 0
+    unsatisfiable = column == 0
+    valid = column == (1 << (1 << len(variables))) - 1
     if valid:
         return "The formula is valid and satisfiable."
     elif unsatisfiable:
@@ -234,6 +426,8 @@ def flatten_connectives(node):
 
 
 def duplicate_node(node):
+    if profiler.enabled:
+        counters["duplicate_node"] += 1
     new_node = Node(node.name)
     for child in node.children:
         duplicated_child = duplicate_node(child)
@@ -1,20 +1,167 @@
-import re
+from collections import OrderedDict
+from formula import Formula, node_to_formula, formula_to_node, get_formula_expression
+from instrumentation import counters
 from utility import *
 
 
-def relaxed_to_strong(prp, is_strong=False, need_print=True):
-    if not is_strong:
-        converter = ShuntingYardConverter(prp, need_print=need_print)
-        prp = converter.convert()
-    return prp
+VARIABLE = "variable"
+CONSTANT = "constant"
+CONNECTIVE = "connective"
+PARENTHESIS = "parenthesis"
+INVALID = "invalid"
+ATOMS = (VARIABLE, CONSTANT)
+PRECEDING_OPERAND = {"∧", "∨", "⇒", "⇔", "¬", "("}
+FOLLOWING_OPERAND = {"∧", "∨", "⇒", "⇔", ")"}
+
+
+class Token:
+    __slots__ = ("kind", "value", "position")
+
+    def __init__(self, kind, value, position):
+        self.kind = kind
+        self.value = value
+        self.position = position
+
+
+    def __repr__(self):
+        return f"Token({self.kind!r}, {self.value!r}, {self.position})"
+
+
+def tokenize(expression):
+    tokens = []
+    index = 0
+    length = len(expression)
+    while index < length:
+        char = expression[index]
+        if "A" <= char <= "Z":
+            end = index + 1
+            while end < length and "0" <= expression[end] <= "9":
+                end += 1
+            tokens.append(Token(VARIABLE, expression[index:end], index))
+            index = end
+            continue
+        if char in "¬∧∨⇒⇔":
+            kind = CONNECTIVE
+        elif char in "()":
+            kind = PARENTHESIS
+        elif char in "⊤⊥":
+            kind = CONSTANT
+        else:
+            kind = INVALID
+        tokens.append(Token(kind, char, index))
+        index += 1
+    counters["tokens"] += len(tokens)
+    return tokens
+
+
+def normalize_expression(expression):
+    return expression.replace(" ", "").replace("→", "⇒")
+
+
+class ParseCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, key, need_print=False):
+        entry = self.entries.get(key)
+        if entry is None or need_print and entry[1] is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+
+    def put(self, key, formula, recorder=None):
+        if self.maxsize <= 0:
+            return
+        self.entries[key] = (formula, recorder)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+
+parse_cache = ParseCache()
+
+
+def relaxed_to_strong(prp, is_strong=False, need_print=True, use_cache=True):
+    if is_strong:
+        return prp
+    if not use_cache:
+        return ShuntingYardConverter(prp, need_print=need_print).convert()
+
+    key = normalize_expression(prp)
+    entry = parse_cache.get(key, need_print)
+    if entry is not None:
+        formula, recorder = entry
+        if need_print:
+            print(recorder.render(), end="")
+        return formula_to_node(formula)
+
+    converter = ShuntingYardConverter(prp, need_print=need_print)
+    node = converter.convert()
+    parse_cache.put(key, node_to_formula(node), converter.recorder)
+    return node
+
+
+class ParseRecorder:
+    def __init__(self):
+        self.events = []
+
+
+    def record(self, kind, *args):
+        self.events.append((kind, args))
+
+
+    def render(self):
+        return "".join(self.render_event(kind, args) for kind, args in self.events)
+
+
+    def render_event(self, kind, args):
+        if kind == "start":
+            return f"Trying to convert {args[0]} to strong syntax while checking if it is a wff.\n"
+        elif kind == "push":
+            return f"\tAdded {args[0].name} to the stack.\n"
+        elif kind == "reduce":
+            operands, formula = args
+            removed = "\tRemoved subtree from the stack:\n" if len(operands) == 1 else "\tRemoved subtrees from the stack:\n"
+            return (removed + "\n".join(get_printed_tree(formula_to_node(operand), 2) for operand in operands)
+                    + "\tCreated new subtree:\n" + get_printed_tree(formula_to_node(formula), 2)
+                    + f"\tAdded {get_formula_expression(formula)} to the stack.\n")
+        elif kind == "stack":
+            stack = args[0]
+            return (f"\tThere {f"are {len(stack)} subtrees" if len(stack) > 1 else 'is one subtree'}:\n"
+                    + "\n".join(get_printed_tree(formula_to_node(subtree), 2) for subtree in stack))
+        elif kind == "strong":
+            return "The formula is already in strong syntax.\n"
+        elif kind == "result":
+            expression, formula = args
+            return (f"This is the tree representation of the formula {expression}:\n" + get_printed_tree(formula_to_node(formula), 1)
+                    + f"The formula is equivalent to {get_formula_expression(formula)}.\n")
+        raise Exception(f"Unknown parse event {kind}.")
 
 
 class ShuntingYardConverter:
-    def __init__(self, expression, need_print=False):
-        self.expression = expression.replace(" ", "").replace("→", "⇒")
+    def __init__(self, expression, need_print=False, recorder=None):
+        self.expression = normalize_expression(expression)
         self.output_queue = []
         self.operator_stack = []
         self.parenthesis = []
+        self.tokens = []
         self.precedence = {
             '¬': 3,  # Unary NOT
             '∧': 2,  # AND
@@ -24,7 +171,17 @@ class ShuntingYardConverter:
         }
         self.right_associative = {'¬'}
         self.need_print = need_print
-        self.print_info = ""
+        self.recorder = recorder if recorder is not None or not need_print else ParseRecorder()
+
+
+    @property
+    def print_info(self):
+        return self.recorder.render() if self.recorder is not None else ""
+
+
+    def print_events(self):
+        if self.recorder is not None:
+            print(self.recorder.render(), end="")
 
 
     def is_operator(self, token):
@@ -36,25 +193,33 @@ class ShuntingYardConverter:
 
 
     def verify_integrity(self):
-        matching = re.findall(r"[A-Z][0-9]*|¬|∧|∨|⇒|⇔|[()]|⊤|⊥.", self.expression)
-        extra_parenthesis = re.findall(r"\([A-Z][0-9]*\)", self.expression)
         if self.expression == "" or self.expression is None:
-            print(self.print_info, end="")
+            self.print_events()
             raise Exception("Empty string is not a wff.\n\n")
         if self.expression[-1] in ["∧", "∨", "⇒", "⇔", "¬"]:
-            print(self.print_info, end="")
+            self.print_events()
             raise Exception(f"{self.expression[-1]} cannot be last in string.\n{self.expression} is not a wwf.\n\n")
-        prop = ""
-        for char in matching:
-            prop += char
-        if prop != self.expression:
-            print(self.print_info, end="")
-            raise Exception(f"Found non-matching character.")
-        if self.expression.count("(") != self.expression.count(")"):
-            print(self.print_info, end="")
+        invalid = None
+        balance = 0
+        extra_parenthesis = []
+        tokens = self.tokens
+        for i, token in enumerate(tokens):
+            if token.kind == INVALID and invalid is None:
+                invalid = token
+            elif token.value == "(":
+                balance += 1
+                if i + 2 < len(tokens) and tokens[i + 1].kind == VARIABLE and tokens[i + 2].value == ")":
+                    extra_parenthesis.append(f"({tokens[i + 1].value})")
+            elif token.value == ")":
+                balance -= 1
+        if invalid is not None:
+            self.print_events()
+            raise Exception(f"Found non-matching character '{invalid.value}' at position {invalid.position}.")
+        if balance:
+            self.print_events()
             raise Exception(f"Different number of opening and closing parenthesis.\n{self.expression} is not a wff.\n\n")
         if extra_parenthesis:
-            print(self.print_info, end="")
+            self.print_events()
             raise Exception(
                 f"{" ".join(elem for elem in extra_parenthesis)} "
                 f"{"has" if len(extra_parenthesis) == 1 else "have"} an extra set of parenthesis.\n{self.expression} is not a wff.\n\n"
@@ -62,49 +227,56 @@ class ShuntingYardConverter:
 
 
     def convert(self):
-        self.print_info += f"Trying to convert {self.expression} to strong syntax while checking if it is a wff.\n"
-        tokens = re.findall(r"[A-Z][0-9]*|¬|∧|∨|⇒|⇔|[()]|⊤|⊥", self.expression)
+        if self.recorder is not None:
+            self.recorder.record("start", self.expression)
+        tokens = self.tokens = tokenize(self.expression)
         self.verify_integrity()
 
+        precedence = self.precedence
+        openings = []
+        previous = None
         for i, token in enumerate(tokens):
-            if i:
-                if (tokens[i - 1] in ["∧", "∨", "⇒", "⇔", "¬", "("] and token in ["∧", "∨", "⇒", "⇔", ")"]) or (tokens[i - 1] == ")" and token == "("):
-                    print(self.print_info, end="")
-                    raise Exception(f"Invalid {"parenthesis" if tokens[i - 1] in ["(", ")"] and token in ["(", ")"] else "connectives"} placement: "
-                                    f"{tokens[i-1]} cannot be followed by {token}\n{self.expression} cannot be a wff.\n\n")
-                if re.match(r"[A-Z][0-9]*|⊤|⊥", tokens[i - 1]) and re.match(r"[A-Z][0-9]*|⊤|⊥", token):
-                    print(self.print_info, end="")
-                    raise Exception(f"An atomic formula '{tokens[i - 1]}' cannot be followed by another atomic formula '{token}'. "
+            value = token.value
+            if previous is not None:
+                if (previous.value in PRECEDING_OPERAND and value in FOLLOWING_OPERAND) or (previous.value == ")" and value == "("):
+                    self.print_events()
+                    raise Exception(f"Invalid {"parenthesis" if previous.kind == PARENTHESIS and token.kind == PARENTHESIS else "connectives"} placement: "
+                                    f"{previous.value} cannot be followed by {value}\n{self.expression} cannot be a wff.\n\n")
+                if previous.kind in ATOMS and token.kind in ATOMS:
+                    self.print_events()
+                    raise Exception(f"An atomic formula '{previous.value}' cannot be followed by another atomic formula '{value}'. "
                                     f"Expected a binary connective between.\n{self.expression} is not a wff.\n\n")
+            previous = token
 
-            if re.match(r"[A-Z][0-9]*|⊤|⊥", token):
-                self.output_queue.append(token)
-            elif token == '(':
-                self.parenthesis.append(i)
-                self.operator_stack.append(token)
-            elif token == ')':
-                self.parenthesis.insert(0, (self.parenthesis.pop(), i))
+            if token.kind in ATOMS:
+                self.output_queue.append(value)
+            elif value == '(':
+                openings.append(i)
+                self.operator_stack.append(value)
+            elif value == ')':
                 while self.operator_stack and self.operator_stack[-1] != '(':
                     self.output_queue.append(self.operator_stack.pop())
                 if len(self.operator_stack) == 0 :
-                    print(self.print_info, end="")
+                    self.print_events()
                     raise Exception(f"Valid expression expected before ).\n{self.expression} is not a wff.\n\n")
                 self.operator_stack.pop()
-            elif self.is_operator(token):
+                self.parenthesis.append((openings.pop(), i))
+            else:
                 while (self.operator_stack and self.operator_stack[-1] != '(' and
-                       (self.precedence_of(self.operator_stack[-1]) > self.precedence_of(token) or
-                        (self.precedence_of(self.operator_stack[-1]) == self.precedence_of(token) and
-                         token not in self.right_associative))):
+                       (precedence[self.operator_stack[-1]] > precedence[value] or
+                        (precedence[self.operator_stack[-1]] == precedence[value] and
+                         value not in self.right_associative))):
                     self.output_queue.append(self.operator_stack.pop())
-                self.operator_stack.append(token)
+                self.operator_stack.append(value)
 
-        for pair in self.parenthesis:
-            lft, rgt = pair
-            if (lft - 1, rgt + 1) in self.parenthesis:
-                print(self.print_info, end="")
+        pairs = set(self.parenthesis)
+        for lft, rgt in reversed(self.parenthesis):
+            if (lft - 1, rgt + 1) in pairs:
+                start, end = tokens[lft - 1].position, tokens[rgt + 1].position
+                self.print_events()
                 raise Exception(
-                    f"Extra set of parenthesis at positions {lft - 1} and {rgt + 1}: "
-                    f"{self.expression[lft - 1:rgt + 2]}.\n{self.expression} is not a wwf.\n\n")
+                    f"Extra set of parenthesis at positions {start} and {end}: "
+                    f"{self.expression[start:end + 1]}.\n{self.expression} is not a wwf.\n\n")
 
         while self.operator_stack:
             self.output_queue.append(self.operator_stack.pop())
@@ -112,43 +284,44 @@ class ShuntingYardConverter:
         converted_formula = flatten_connectives(self.construct_expression_from_postfix())
 
 
-        if self.need_print:
+        if self.recorder is not None:
             if get_node_expression(converted_formula).replace(" ", "") == self.expression:
-                self.print_info += f"The formula is already in strong syntax.\n"
-            self.print_info += f"This is the tree representation of the formula {self.expression}:\n" + get_printed_tree(converted_formula, 1)
-            self.print_info += f"The formula is equivalent to {get_node_expression(converted_formula)}.\n"
-            print(self.print_info, end="")
+                self.recorder.record("strong")
+            self.recorder.record("result", self.expression, node_to_formula(converted_formula))
+        if self.need_print:
+            self.print_events()
 
         return converted_formula
 
 
     def construct_expression_from_postfix(self):
+        recorder = self.recorder
         stack = []
+        formulas = []
         for token in self.output_queue:
             if token in self.precedence:
                 if token == '¬':
-                    prop = stack.pop()
-                    self.print_info += "\tRemoved subtree from the stack:\n" + get_printed_tree(prop,2)
-                    expression = Node("¬", children=[prop])
-                    self.print_info += f"\tCreated new subtree:\n" + get_printed_tree(expression,2)
+                    children = [stack.pop()]
                 else:
                     right = stack.pop()
-                    left = stack.pop()
-                    self.print_info += "\tRemoved subtrees from the stack:\n" + get_printed_tree(left,2) + "\n" + get_printed_tree(right,2)
-                    expression = Node(token, children=[left, right])
-                    self.print_info += f"\tCreated new subtree:\n" + get_printed_tree(expression,2)
-                self.print_info += f"\tAdded {get_node_expression(expression)} to the stack.\n"
-                stack.append(expression)
+                    children = [stack.pop(), right]
+                expression = Node(token, children=children)
+                if recorder is not None:
+                    operands = formulas[-len(children):]
+                    del formulas[-len(children):]
+                    formula = Formula(token, operands)
+                    recorder.record("reduce", operands, formula)
             else:
-                self.print_info += f"\tAdded {token} to the stack.\n"
-                stack.append(Node(token))
-            self.print_info += (
-                    f"\tThere {f"are {len(stack)} subtrees" if len(stack) > 1 else 'is one subtree'}:\n"
-                    + f"{get_printed_tree(stack[0], 2)}"
-                    + "".join(f"\n{get_printed_tree(subtree, 2)}" for subtree in stack[1:])
-            )
+                expression = Node(token)
+                if recorder is not None:
+                    formula = Formula(token)
+                    recorder.record("push", formula)
+            stack.append(expression)
+            if recorder is not None:
+                formulas.append(formula)
+                recorder.record("stack", tuple(formulas))
         if len(stack) != 1:
-            print(self.print_info, end="")
+            self.print_events()
             raise Exception(
                 f"Received a different number of binary connectives than expected, could not unite subtrees:\n"
                 + f"{get_printed_tree(stack[0], 2)}"